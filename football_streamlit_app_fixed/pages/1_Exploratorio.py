@@ -1,34 +1,43 @@
 import streamlit as st
-from src.state import init_state
+from src.state import init_state, take_rows
 from src.data import uploader_ui
-from src.filters import global_filters_ui, apply_global_filters
-from src.exploratory import overview, missing_table, numeric_describe
+from src.filters import global_filters_ui, apply_global_filters, filter_result_cache
+from src.exploratory import dataset_profile, overview, missing_table, numeric_describe
 
 init_state()
 
 st.title("📊 Exploratorio de Datos (Fútbol)")
 
-if st.session_state.df_raw is None:
-    df = uploader_ui()
-    if df is not None:
-        st.session_state.df_raw = df
+if st.session_state.dataset is None:
+    st.session_state.dataset = uploader_ui()
+    if st.session_state.dataset is not None:
+        st.rerun()  # arrancar limpio (los widgets del uploader ya no se muestran)
 
-df_raw = st.session_state.df_raw
-if df_raw is None:
+if st.session_state.dataset is None:
     st.info("Subí un dataset para comenzar.")
     st.stop()
 
+# el exploratorio usa todas las columnas
+df_raw = st.session_state.dataset.to_pandas()
+
 st.subheader("Filtros globales")
-global_filters_ui(df_raw)
+global_filters_ui(st.session_state.dataset)
 
 if st.button("Aplicar filtros", type="primary"):
-    st.session_state.df_global = apply_global_filters(df_raw)
+    st.session_state.global_rows = apply_global_filters(st.session_state.dataset)
     st.success("Filtros aplicados.")
+    cache_stats = filter_result_cache().stats()
+    st.caption(
+        f"Cache de filtros: {cache_stats['hits']} hits / {cache_stats['misses']} misses · "
+        f"{cache_stats['entries']} entradas ({cache_stats['bytes'] / 1024:.0f} KB)"
+    )
 
-df_use = st.session_state.df_global if st.session_state.df_global is not None else df_raw
+df_use = take_rows(df_raw, st.session_state.global_rows)
 
 st.subheader("Resumen")
-overview(df_use)
+# una sola pasada, cacheada por dataset + filas: mover un slider de abajo no la recalcula
+prof = dataset_profile(st.session_state.dataset, df_use, st.session_state.global_rows)
+overview(prof)
 
 with st.expander("Vista rápida (head)"):
     st.dataframe(df_use.head(50), use_container_width=True)
@@ -36,22 +45,23 @@ with st.expander("Vista rápida (head)"):
 c1, c2 = st.columns(2)
 with c1:
     st.subheader("Nulos (top)")
-    missing_table(df_use, top_n=30)
+    missing_table(prof, top_n=30)
 with c2:
     st.subheader("Describe numérico")
-    numeric_describe(df_use)
+    numeric_describe(prof)
 
 
 st.divider()
 st.divider()
 st.subheader("🐝 Beeswarm (abejas)")
 
-from src.charts.bees import beeswarm_single, beeswarm_grid, beeswarm_grid_preset
-from src.export_utils import fig_to_png_bytes, fig_to_svg_text
+from src.charts.bees import beeswarm_single, beeswarm_grid, beeswarm_grid_preset, prepare_bees
+from src.percentiles import percentile_cube
+from src.sketches import dataset_quantiles
 from src.theme import load_font_from_assets
-import numpy as np
+import pandas as pd
 
-numeric_cols = [c for c in df_use.columns if np.issubdtype(df_use[c].dtype, np.number)]
+numeric_cols = [c for c in df_use.columns if pd.api.types.is_numeric_dtype(df_use[c])]
 player_col = "Jugador" if "Jugador" in df_use.columns else None
 
 if not numeric_cols:
@@ -87,6 +97,7 @@ else:
         curve_rad = st.slider("Curvatura línea", 0.00, 0.60, 0.30, 0.05)
 
         p_low, p_high = st.slider("Cortes (quantiles)", 0.05, 0.95, (0.33, 0.67), step=0.01)
+        por_grupo = st.checkbox("Colorear por percentil del grupo (Temporada × Liga × posición)", value=False)
 
         lower_opts = st.multiselect(
             "Métricas donde LOWER = mejor (invertir eje)",
@@ -121,6 +132,16 @@ else:
             st.warning("En 'Una métrica' seleccioná exactamente 1 métrica.")
             st.stop()
 
+        # Cortes por métrica una sola vez (sketches por Temporada x Liga si la selección lo permite)
+        q_cuts = dataset_quantiles(st.session_state.dataset, st.session_state.global_rows, metrics, [p_low, p_high])
+        cuts = {m: (q_cuts[m].iloc[0], q_cuts[m].iloc[1]) for m in q_cuts.columns}
+        # Clasificación de todas las métricas una vez; los runs por jugador sólo dibujan
+        # Percentil del grupo: lookup en el cubo precalculado del dataset
+        pct = percentile_cube(st.session_state.dataset).frame(df_use, metrics) if por_grupo else None
+        if por_grupo:
+            st.caption("Color por percentil dentro de Temporada × Liga × posición: los cortes varían por grupo y no se dibujan.")
+        prepared = prepare_bees(df_use, metrics, player_col or "Jugador", set(lower_opts), p_low, p_high, cuts, percentiles=pct)
+
         # Regla: 0->sin destacados, 1->uno, 2->dos en el mismo, 3+->uno por jugador
         if len(players) == 0:
             runs = [None]
@@ -131,53 +152,60 @@ else:
         else:
             runs = [[p] for p in players]
 
-        for players_sel in runs:
-            if mode == "Una métrica":
-                fig = beeswarm_single(
-                    df_use,
-                    metric=metrics[0],
-                    player_col=player_col or "Jugador",
-                    player=players_sel,
-                    lower_is_better=set(lower_opts),
-                    p_low=p_low,
-                    p_high=p_high,
-                    font=font,
-                    show_player_label=show_label,
-                    label_y_offset=label_y_offset,
-                    curve_rad=curve_rad,
-                )
-
-            elif mode == "Varias métricas (grid)":
-                fig = beeswarm_grid(
-                    df_use,
-                    metrics=metrics,
-                    ncols=ncols,
-                    player_col=player_col or "Jugador",
-                    player=players_sel,
-                    lower_is_better=set(lower_opts),
-                    p_low=p_low,
-                    p_high=p_high,
-                    font=font,
-                )
+        # Capa estática (swarms, cortes, títulos) una sola vez; cada run sólo compone sus destacados
+        if mode == "Una métrica":
+            layers = beeswarm_single(
+                df_use,
+                metric=metrics[0],
+                player_col=player_col or "Jugador",
+                lower_is_better=set(lower_opts),
+                p_low=p_low,
+                p_high=p_high,
+                font=font,
+                cuts=cuts,
+                prepared=prepared,
+                layered=True,
+                show_player_label=show_label,
+                label_y_offset=label_y_offset,
+                curve_rad=curve_rad,
+            )
 
-            else:
-                fig = beeswarm_grid_preset(
-                    df_use,
-                    metrics=metrics,
-                    nrows=4,
-                    ncols=3,
-                    player_col=player_col or "Jugador",
-                    player=players_sel,
-                    lower_is_better=set(lower_opts),
-                    p_low=p_low,
-                    p_high=p_high,
-                    font=font,
-                    show_player_label=show_label,
-                    label_y_offset=label_y_offset,
-                    curve_rad=curve_rad,
-                )
+        elif mode == "Varias métricas (grid)":
+            layers = beeswarm_grid(
+                df_use,
+                metrics=metrics,
+                ncols=ncols,
+                player_col=player_col or "Jugador",
+                lower_is_better=set(lower_opts),
+                p_low=p_low,
+                p_high=p_high,
+                font=font,
+                cuts=cuts,
+                prepared=prepared,
+                layered=True,
+            )
 
-            st.pyplot(fig, use_container_width=True)
+        else:
+            layers = beeswarm_grid_preset(
+                df_use,
+                metrics=metrics,
+                nrows=4,
+                ncols=3,
+                player_col=player_col or "Jugador",
+                lower_is_better=set(lower_opts),
+                p_low=p_low,
+                p_high=p_high,
+                font=font,
+                cuts=cuts,
+                prepared=prepared,
+                layered=True,
+                show_player_label=show_label,
+                label_y_offset=label_y_offset,
+                curve_rad=curve_rad,
+            )
+
+        for players_sel in runs:
+            st.image(layers.png(players_sel, dpi=200, transparent=False))
 
             if players_sel is None:
                 fname = "bees.png"
@@ -186,10 +214,10 @@ else:
             else:
                 fname = f"bees_{str(players_sel[0]).replace(' ', '_')}_vs_{str(players_sel[1]).replace(' ', '_')}.png"
 
-            png_bytes = fig_to_png_bytes(fig, dpi=300, transparent=True)
+            png_bytes = layers.png(players_sel, dpi=300, transparent=True)
             st.download_button("⬇️ Descargar PNG (transparente)", data=png_bytes, file_name=fname, mime="image/png")
 
-            svg = fig_to_svg_text(fig)
+            svg = layers.svg(players_sel)
             with st.expander("📋 Copiar SVG"):
                 st.code(svg, language="xml")
 
@@ -198,11 +226,12 @@ st.divider()
 st.subheader("📡 Scatter (v2)")
 
 from src.charts.scatter import plot_scatter_v2
+from src.charts.scatter_vega import scatter_vega
 from src.export_utils import fig_to_png_bytes, fig_to_svg_text
 from src.theme import load_font_from_assets
-import numpy as np
+import pandas as pd
 
-numeric_cols = [c for c in df_use.columns if np.issubdtype(df_use[c].dtype, np.number)]
+numeric_cols = [c for c in df_use.columns if pd.api.types.is_numeric_dtype(df_use[c])]
 label_col = "Jugador" if "Jugador" in df_use.columns else df_use.columns[0]
 team_col = "Equipo" if "Equipo" in df_use.columns else ("Equipo durante el período seleccionado" if "Equipo durante el período seleccionado" in df_use.columns else label_col)
 
@@ -231,10 +260,27 @@ else:
                 equipo_resaltado = None
 
         ref_type = st.radio("Líneas de referencia", ["Mediana", "Media"], horizontal=True)
+        exportar_scatter = st.checkbox("Generar PNG/SVG para exportar", value=False)
 
         submitted_scatter = st.form_submit_button("Graficar Scatter", type="primary")
 
     if submitted_scatter:
+        # vista interactiva en el navegador (tooltips, zoom); matplotlib sólo para exportar
+        spec, data = scatter_vega(
+            df_use,
+            x_col=x_col,
+            y_col=y_col,
+            label_col=label_col,
+            team_col=team_col,
+            jugador_destacado=jugador_destacado,
+            equipo_resaltado=equipo_resaltado,
+            top_n=top_n,
+            ref_type=ref_type,
+            ds=st.session_state.dataset,
+        )
+        st.vega_lite_chart(data, spec, use_container_width=True, theme=None)
+
+    if submitted_scatter and exportar_scatter:
         font = load_font_from_assets("RockySans.ttf")
         fig, _ = plot_scatter_v2(
             df_use,
@@ -249,8 +295,10 @@ else:
             subtitulo=None,
             ref_type=ref_type,
             font=font,
+            ds=st.session_state.dataset,
         )
-        st.pyplot(fig, use_container_width=True)
+        with st.expander("🖼️ Vista de exportación"):
+            st.pyplot(fig, use_container_width=True)
 
         png_bytes = fig_to_png_bytes(fig, dpi=300, transparent=True)
         st.download_button("⬇️ Descargar PNG (transparente)", data=png_bytes, file_name="scatter.png", mime="image/png")
@@ -263,25 +311,45 @@ else:
 st.divider()
 st.subheader("🕸️ Radar (mplsoccer)")
 
-from src.charts.radar import prepare_radar_values, plot_radar
-from src.export_utils import fig_to_png_bytes, fig_to_svg_text
+from src.charts.radar import radar_values, radar_sheet, plot_radar
+from src.percentiles import percentile_cube
+from src.player_index import SEASON_COL, player_index, season_rank
+from src.sketches import dataset_quantiles
 from src.theme import load_font_from_assets
-import numpy as np
+import pandas as pd
 
-numeric_cols = [c for c in df_use.columns if np.issubdtype(df_use[c].dtype, np.number)]
+numeric_cols = [c for c in df_use.columns if pd.api.types.is_numeric_dtype(df_use[c])]
 player_col = "Jugador" if "Jugador" in df_use.columns else None
 
 if not player_col:
     st.info("No encuentro columna 'Jugador' para el radar.")
 else:
+    squad_col = next((c for c in ("Equipo", "Equipo durante el período seleccionado") if c in df_use.columns), None)
     with st.form("radar_form", clear_on_submit=False):
+        modo_radar = st.radio("Modo", ["Comparación", "Plantel (small multiples)"], horizontal=True)
         metrics = st.multiselect("Métricas del radar", options=numeric_cols, default=numeric_cols[:8])
         players = st.multiselect(
             "Jugador(es) (1 o 2 recomendado)",
             options=sorted(df_use[player_col].dropna().astype(str).unique().tolist()),
             default=[]
         )
+        season = None
+        if SEASON_COL in df_use.columns:
+            seasons = df_use[SEASON_COL].dropna().unique()
+            seasons = [t for _, t in sorted(zip(season_rank(seasons), seasons), reverse=True)]
+            season = st.selectbox("Temporada del jugador", options=["(Más reciente)"] + [str(t) for t in seasons])
+            if season == "(Más reciente)":
+                season = None
+        equipo_plantel = None
+        if squad_col:
+            equipo_plantel = st.selectbox(
+                "Equipo (modo plantel)",
+                options=["(None)"] + sorted(df_use[squad_col].dropna().astype(str).unique().tolist()),
+            )
+            if equipo_plantel == "(None)":
+                equipo_plantel = None
         compare_to = st.selectbox("Comparar vs", options=["(Nada)", "Media muestra", "Mediana muestra"], index=0)
+        en_percentiles = st.checkbox("Normalizar en percentiles del grupo (Temporada × Liga × posición)", value=False)
 
         lower_opts = st.multiselect(
             "Métricas donde LOWER = mejor",
@@ -295,28 +363,40 @@ else:
         if not metrics:
             st.warning("Elegí al menos 3 métricas para un radar legible.")
             st.stop()
-        if len(players) == 0 and compare_to == "(Nada)":
+        plantel = modo_radar == "Plantel (small multiples)"
+        if plantel and not equipo_plantel:
+            st.warning("Elegí un equipo para la hoja de plantel.")
+            st.stop()
+        if not plantel and len(players) == 0 and compare_to == "(Nada)":
             st.warning("Elegí al menos un jugador o una referencia (media/mediana).")
             st.stop()
 
-        # valores
-        params, low, high, mean_vals, median_vals, vals_by_player = prepare_radar_values(
-            df_use, metrics=metrics, player_col=player_col, players=players, lower_is_better=set(lower_opts)
+        season_sel = season
+        if plantel:
+            # plantel: jugadores del equipo en la temporada elegida (o la más reciente del equipo)
+            en_equipo = df_use[df_use[squad_col].astype(str) == equipo_plantel]
+            if season_sel is None and SEASON_COL in en_equipo.columns and en_equipo[SEASON_COL].notna().any():
+                temporadas_eq = en_equipo[SEASON_COL].dropna().unique()
+                season_sel = max(zip(season_rank(temporadas_eq), temporadas_eq))[1]
+            if season_sel is not None and SEASON_COL in en_equipo.columns:
+                en_equipo = en_equipo[en_equipo[SEASON_COL].astype(str) == str(season_sel)]
+            radar_players = en_equipo[player_col].dropna().astype(str).unique().tolist()
+        else:
+            radar_players = players[:2]
+
+        # valores: filas por índice de jugador (temporada elegida o la más reciente)
+        rv = radar_values(
+            df_use, metrics=metrics, players=radar_players, index=player_index(st.session_state.dataset, player_col),
+            player_col=player_col, season=season_sel,
+            quantiles=None if en_percentiles else dataset_quantiles(st.session_state.dataset, st.session_state.global_rows, metrics, [0.10, 0.90, 0.50]),
+            cube=percentile_cube(st.session_state.dataset) if en_percentiles else None,
         )
-
-        names = []
-        values = []
-        if players:
-            for p in players[:2]:
-                names.append(p)
-                values.append(vals_by_player[p])
-
-        if compare_to == "Media muestra":
-            names.append("Media")
-            values.append(mean_vals)
-        elif compare_to == "Mediana muestra":
-            names.append("Mediana")
-            values.append(median_vals)
+        params, low, high = rv.params, rv.low.tolist(), rv.high.tolist()
+        mean_vals, median_vals = rv.mean.tolist(), rv.median.tolist()
+        if plantel:
+            st.caption(f"{equipo_plantel} · {season_sel if season_sel is not None else 'todas las temporadas'} · {len(radar_players)} jugadores")
+        elif any(t is not None for t in rv.seasons):
+            st.caption(" · ".join(f"{p}: {t if t is not None else 'sin datos'}" for p, t in zip(rv.players, rv.seasons)))
 
         font_thin = load_font_from_assets("AVGARDN_2.TTF")
         font_bold = load_font_from_assets("AVGARDD_2.TTF")
@@ -326,23 +406,88 @@ else:
         if font_bold is None:
             font_bold = load_font_from_assets("RockySans.ttf")
 
-        fig = plot_radar(
+        # plantilla cacheada por params + rangos: por jugador sólo se dibujan polígonos y valores
+        template = plot_radar(
             params=params,
             low=low,
             high=high,
-            names=names,
-            values=values,
-            colors=["#4b4efb", "#FB8E4B", "#109fd5"],
+            names=[],
+            values=[],
             lower_is_better=lower_opts,
             show_max_labels=False,
             font_thin=font_thin,
             font_bold=font_bold,
+            layered=True,
         )
-        st.pyplot(fig, use_container_width=True)
 
-        png_bytes = fig_to_png_bytes(fig, dpi=300, transparent=True)
-        st.download_button("⬇️ Descargar PNG (transparente)", data=png_bytes, file_name="radar.png", mime="image/png")
+        if plantel:
+            sheet = radar_sheet(template, rv.players, rv.values.tolist(), ncols=5)
+            st.image(sheet, use_container_width=True)
+            st.download_button("⬇️ Descargar hoja de plantel (PNG)", data=sheet, file_name="radar_plantel.png", mime="image/png")
+        else:
+            names = []
+            values = []
+            for p, v in zip(rv.players, rv.values):
+                names.append(p)
+                values.append(v.tolist())
 
-        svg = fig_to_svg_text(fig)
-        with st.expander("📋 Copiar SVG"):
-            st.code(svg, language="xml")
+            if compare_to == "Media muestra":
+                names.append("Media")
+                values.append(mean_vals)
+            elif compare_to == "Mediana muestra":
+                names.append("Mediana")
+                values.append(median_vals)
+
+            colors = ["#4b4efb", "#FB8E4B", "#109fd5"]
+            st.image(template.png(names, values, colors, dpi=100, transparent=False), use_container_width=True)
+
+            png_bytes = template.png(names, values, colors, dpi=300, transparent=True)
+            st.download_button("⬇️ Descargar PNG (transparente)", data=png_bytes, file_name="radar.png", mime="image/png")
+
+            svg = template.svg(names, values, colors)
+            with st.expander("📋 Copiar SVG"):
+                st.code(svg, language="xml")
+
+
+st.divider()
+st.subheader("📊 Percentiles (Temporada × Liga × grupo de posición)")
+
+from src.percentiles import POSITION_COLS, percentile_cube
+import pandas as pd
+
+numeric_cols = [c for c in df_use.columns if pd.api.types.is_numeric_dtype(df_use[c])]
+player_col = "Jugador" if "Jugador" in df_use.columns else None
+
+if not numeric_cols:
+    st.info("No detecté columnas numéricas para percentiles.")
+else:
+    with st.form("pct_form", clear_on_submit=False):
+        pct_metrics = st.multiselect("Métricas", options=numeric_cols, default=numeric_cols[:6])
+        pct_players = st.multiselect(
+            "Jugador(es) (vacío = toda la selección)",
+            options=sorted(df_use[player_col].dropna().astype(str).unique().tolist()) if player_col else [],
+            default=[]
+        )
+        submitted_pct = st.form_submit_button("Ver percentiles", type="primary")
+
+    if submitted_pct:
+        if not pct_metrics:
+            st.info("Elegí al menos una métrica.")
+            st.stop()
+        filas = df_use
+        if pct_players:
+            filas = df_use[df_use[player_col].astype(str).isin(pct_players)]
+        # el cubo se calcula una vez por dataset; acá sólo se leen filas x KPIs
+        tabla = percentile_cube(st.session_state.dataset).table(
+            filas, pct_metrics, info_cols=[c for c in (player_col, "Equipo", "Temporada", "Liga", *POSITION_COLS) if c],
+        )
+        st.caption(f"{len(tabla)} filas · percentil = % del grupo con valor ≤ al del jugador")
+        st.dataframe(
+            tabla.head(1000),
+            use_container_width=True,
+            hide_index=True,
+            column_config={
+                m: st.column_config.ProgressColumn(m, min_value=0, max_value=100, format="%d")
+                for m in pct_metrics
+            },
+        )
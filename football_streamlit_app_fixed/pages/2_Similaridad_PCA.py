@@ -1,22 +1,24 @@
 import streamlit as st
+import numpy as np
 import matplotlib.pyplot as plt
 
-from src.state import init_state
+from src.state import init_state, row_positions, take_rows
 from src.data import uploader_ui
-from src.pca_similarity import run_pca_similarity
+from src.pca_similarity import similarity_index
+from src.text_index import split_terms, text_index
 
 init_state()
 
 st.title("🔎 Jugadores Similares (PCA)")
 
 # Asegurar dataset cargado (si entran directo a esta página)
-if st.session_state.df_raw is None:
-    df = uploader_ui()
-    if df is not None:
-        st.session_state.df_raw = df
+if st.session_state.dataset is None:
+    st.session_state.dataset = uploader_ui()
+    if st.session_state.dataset is not None:
+        st.rerun()  # arrancar limpio (los widgets del uploader ya no se muestran)
 
-df = st.session_state.df_raw
-if df is None:
+ds = st.session_state.dataset
+if ds is None:
     st.info("Subí un dataset para comenzar.")
     st.stop()
 
@@ -29,54 +31,68 @@ kpis = [
 ]
 
 # Chequeo rápido de KPIs faltantes
-faltan = [c for c in kpis if c not in df.columns]
+faltan = [c for c in kpis if c not in ds.columns]
 if faltan:
     st.warning(f"Hay KPIs que no están en tu dataset (se omiten): {', '.join(faltan[:8])}" + ("..." if len(faltan)>8 else ""))
-    kpis = [c for c in kpis if c in df.columns]
+    kpis = [c for c in kpis if c in ds.columns]
 
 if not kpis:
     st.error("No quedaron KPIs disponibles para correr PCA. Revisá nombres de columnas.")
     st.stop()
 
+# Sólo cargamos lo que usa esta página (KPIs + identificación + columnas de la tabla final)
+cols_info = ["Jugador", "Temporada", "posicion", "minutos_jugados", "País", "Edad", "Liga", "Equipo", "Pie", "Nacionalidad"]
+df = ds.select(cols_info + kpis)
+
 st.subheader("1) Filtro base por posición y minutos")
 min_minutos = st.slider("Minutos jugados mínimos", 0, int(df["minutos_jugados"].max()) if "minutos_jugados" in df.columns else 2000, 300, step=50)
 texto_posicion = st.text_input("Contiene en posición (ej: CB|LCB|RCB)", value="")
 
 if st.button("Aplicar filtro (posición/minutos)", type="primary"):
-    df_pos = df.copy()
-    if "minutos_jugados" in df_pos.columns:
-        df_pos = df_pos[df_pos["minutos_jugados"] >= min_minutos]
-    if texto_posicion and "posicion" in df_pos.columns:
-        df_pos = df_pos[df_pos["posicion"].astype(str).str.contains(texto_posicion, case=False, na=False)]
-    df_pos = df_pos.dropna(subset=kpis)
-    st.session_state.df_pos = df_pos
+    mask = df[kpis].notna().all(axis=1).to_numpy()
+    if "minutos_jugados" in df.columns:
+        mask = mask & (df["minutos_jugados"] >= min_minutos).to_numpy()
+    if texto_posicion and "posicion" in df.columns:
+        mask = mask & text_index(ds, "posicion").mask(split_terms(texto_posicion))
+    df_pos = df[mask]
+    st.session_state.pos_rows = row_positions(df_pos)
     st.success(f"Base filtrada: {df_pos.shape[0]} filas")
 
-df_pos = st.session_state.df_pos
-if df_pos is None or df_pos.empty:
+if st.session_state.pos_rows is None or len(st.session_state.pos_rows) == 0:
     st.info("Aplicá el filtro para habilitar el modelo.")
     st.stop()
 
+df_pos = take_rows(df, st.session_state.pos_rows)
+
 st.subheader("2) Elegí jugador + temporada y corré el modelo")
 jugador = st.selectbox("Jugador de referencia", options=sorted(df_pos["Jugador"].dropna().unique().tolist()))
 temporadas_j = sorted(df_pos[df_pos["Jugador"] == jugador]["Temporada"].dropna().unique().tolist()) if "Temporada" in df_pos.columns else []
 temporada = st.selectbox("Temporada", options=temporadas_j if temporadas_j else sorted(df_pos["Temporada"].dropna().unique().tolist()))
 
+# La tabla muestra como máximo MAX_SIMILARES filas: el índice sólo devuelve ese top-k
+MAX_SIMILARES = 200
+
 if st.button("Correr similitud (PCA)", type="primary"):
     try:
-        df_modelado, df_similares = run_pca_similarity(df_pos, kpis, jugador, temporada)
-        st.session_state.df_modelado = df_modelado
-        st.session_state.similares = df_similares
+        index = similarity_index(df_pos, kpis, digest=ds.digest)
+        rows, dist = index.query(jugador, temporada, k=MAX_SIMILARES)
+        st.session_state.modelado_rows = index.rows
+        st.session_state.pca_coords = index.coords.astype(np.float32)
+        st.session_state.similares_rows = rows
+        st.session_state.similares_dist = dist.astype(np.float32)
+        st.session_state.similares_ref = (jugador, temporada)
         st.success("Modelo corrido.")
     except Exception as e:
         st.error(str(e))
 
-df_sim = st.session_state.similares
-df_modelado = st.session_state.df_modelado
-
-if df_sim is None or df_modelado is None:
+if st.session_state.modelado_rows is None or st.session_state.similares_rows is None:
     st.stop()
 
+# Reconstruimos las vistas desde el dataset compartido + filas/coordenadas de la sesión
+coords = st.session_state.pca_coords
+df_modelado = take_rows(df, st.session_state.modelado_rows).assign(PCA1=coords[:, 0], PCA2=coords[:, 1])
+df_sim = take_rows(df, st.session_state.similares_rows).assign(distancia=st.session_state.similares_dist)
+
 st.subheader("3) Visualización PCA")
 # Scatter simple (luego lo llevamos a tu estética)
 fig, ax = plt.subplots()
@@ -89,26 +105,36 @@ ax.set_ylabel("PCA2")
 st.pyplot(fig, use_container_width=True)
 
 st.subheader("4) Filtros adicionales sobre resultados")
+# opciones sobre toda la base modelada: el top-k se vuelve a consultar dentro del filtro
 cols = st.columns(4)
 with cols[0]:
-    filtro_pais = st.multiselect("País", options=sorted(df_sim["País"].dropna().unique().tolist())) if "País" in df_sim.columns else []
+    filtro_pais = st.multiselect("País", options=sorted(df_modelado["País"].dropna().unique().tolist())) if "País" in df_modelado.columns else []
 with cols[1]:
-    filtro_liga = st.multiselect("Liga", options=sorted(df_sim["Liga"].dropna().unique().tolist())) if "Liga" in df_sim.columns else []
+    filtro_liga = st.multiselect("Liga", options=sorted(df_modelado["Liga"].dropna().unique().tolist())) if "Liga" in df_modelado.columns else []
 with cols[2]:
-    filtro_pie = st.multiselect("Pie", options=sorted(df_sim["Pie"].dropna().unique().tolist())) if "Pie" in df_sim.columns else []
+    filtro_pie = st.multiselect("Pie", options=sorted(df_modelado["Pie"].dropna().unique().tolist())) if "Pie" in df_modelado.columns else []
 with cols[3]:
-    filtro_nac = st.multiselect("Nacionalidad", options=sorted(df_sim["Nacionalidad"].dropna().unique().tolist())) if "Nacionalidad" in df_sim.columns else []
+    filtro_nac = st.multiselect("Nacionalidad", options=sorted(df_modelado["Nacionalidad"].dropna().unique().tolist())) if "Nacionalidad" in df_modelado.columns else []
 
 if st.button("Aplicar filtros adicionales"):
-    out = df_sim.copy()
-    if filtro_pais: out = out[out["País"].isin(filtro_pais)]
-    if filtro_liga: out = out[out["Liga"].isin(filtro_liga)]
-    if filtro_pie: out = out[out["Pie"].isin(filtro_pie)]
-    if filtro_nac: out = out[out["Nacionalidad"].isin(filtro_nac)]
-    st.session_state.similares = out
-    st.success("Filtros aplicados.")
+    # mismo índice cacheado (dataset + base filtrada + KPIs); top-k dentro de la máscara
+    index = similarity_index(df_pos, kpis, digest=ds.digest)
+    base = take_rows(df, index.rows)
+    within = np.ones(len(base), dtype=bool)
+    if filtro_pais: within &= base["País"].isin(filtro_pais).to_numpy()
+    if filtro_liga: within &= base["Liga"].isin(filtro_liga).to_numpy()
+    if filtro_pie: within &= base["Pie"].isin(filtro_pie).to_numpy()
+    if filtro_nac: within &= base["Nacionalidad"].isin(filtro_nac).to_numpy()
+    try:
+        rows, dist = index.query(*st.session_state.similares_ref, k=MAX_SIMILARES, within=within)
+        st.session_state.similares_rows = rows
+        st.session_state.similares_dist = dist.astype(np.float32)
+        df_sim = take_rows(df, rows).assign(distancia=st.session_state.similares_dist)
+        st.success("Filtros aplicados.")
+    except Exception as e:
+        st.error(str(e))
 
 st.subheader("5) Tabla final")
-n = st.slider("Cantidad de jugadores a mostrar", 5, 200, 20, step=5)
-cols_show = [c for c in ["Jugador","País","Edad","Liga","Equipo","Temporada","Pie","posicion","minutos_jugados","distancia"] if c in st.session_state.similares.columns]
-st.dataframe(st.session_state.similares[cols_show].head(n), use_container_width=True)
+n = st.slider("Cantidad de jugadores a mostrar", 5, MAX_SIMILARES, 20, step=5)
+cols_show = [c for c in ["Jugador","País","Edad","Liga","Equipo","Temporada","Pie","posicion","minutos_jugados","distancia"] if c in df_sim.columns]
+st.dataframe(df_sim[cols_show].head(n), use_container_width=True)
@@ -1,14 +1,25 @@
 from __future__ import annotations
 
-from typing import Iterable, Sequence, Optional, Set, List, Union
+import math
+import os
+import threading
+import warnings
+from collections import deque
+from dataclasses import dataclass
+from typing import Iterable, Mapping, Sequence, Optional, Set, List, Union
 
 import numpy as np
 import pandas as pd
 import matplotlib.pyplot as plt
-import seaborn as sns
+from matplotlib.collections import PathCollection
+from matplotlib.markers import MarkerStyle
 from matplotlib.patches import FancyArrowPatch
+from matplotlib.transforms import IdentityTransform
 from matplotlib.font_manager import FontProperties
 
+from src.charts.layers import LayeredFigure
+from src.charts.render_worker import RenderPool
+
 DEFAULT_PALETTE = {
     "rojo": "red",
     "amarillo": "gold",
@@ -20,39 +31,121 @@ DEFAULT_PALETTE = {
 BG = "#191919"
 FG = "white"
 HILITE_COLORS = ("#4b4efb", "#FB8E4B")
-
-
-def plot_bees(ax, aux_df: pd.DataFrame, palette: dict, size: float = 6, jitter: float = 0.25, threshold: int = 150):
-    """Swarm para pocos puntos, strip para muchos (mucho más rápido)."""
-    n = len(aux_df)
-    if n <= threshold:
-        sns.swarmplot(
-            ax=ax,
-            y=[""] * n,
-            x="valor",
-            hue="color",
-            data=aux_df,
-            palette=palette,
-            dodge=False,
-            size=size,
-            orient="h",
-            legend=False,
-        )
-    else:
-        sns.stripplot(
-            ax=ax,
-            y=[""] * n,
-            x="valor",
-            hue="color",
-            data=aux_df,
-            palette=palette,
-            dodge=False,
-            size=size,
-            orient="h",
-            jitter=jitter,
-            alpha=0.85,
-            legend=False,
+# Render en paralelo: APAGADO por defecto (1 worker = todo en serie). No hay mediciones en
+# máquinas multinúcleo que justifiquen otro default; se prende con FOOTBALL_RENDER_WORKERS=N
+# (N > 1, nunca más que los núcleos usables) y conviene medir en el servidor antes de hacerlo.
+_CORES = len(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else (os.cpu_count() or 1)
+RENDER_WORKERS = min(int(os.environ.get("FOOTBALL_RENDER_WORKERS", 1)), _CORES)
+# ya prendido: serie ~15 µs/punto, arrancar un worker ~1.2 s; por debajo de ~200k puntos
+# (suma de paneles) no compensa. Estimado en un solo núcleo, no medido con workers reales.
+PARALLEL_MIN_POINTS = int(os.environ.get("FOOTBALL_RENDER_PARALLEL_MIN", 200_000))
+CLASSES = np.array(["rojo", "amarillo", "verde", "gris"])
+
+
+@dataclass
+class MetricBees:
+    """Datos de un panel: valores no nulos, clase de color por punto y cortes."""
+    metric: str
+    values: np.ndarray      # float64
+    classes: np.ndarray     # uint8, índice en CLASSES
+    players: np.ndarray     # nombre (str, sin espacios extremos) por punto
+    p1: float
+    p2: float
+    lower_is_better: bool
+
+
+def swarm_layout(x: np.ndarray, diameter: float, limit: float = np.inf) -> np.ndarray:
+    """
+    Desplazamiento vertical de cada punto para que no se solapen (misma unidad que x).
+    Barrido por x ordenado: sólo chocan los puntos activos a menos de un diámetro
+    (cola deslizante); sus intervalos prohibidos se fusionan y el punto va al borde
+    libre más cercano al centro. Lo que no entra en +-limit queda en el borde y sale
+    de la cola, así cada paso mira a lo sumo ~4*limit/diameter puntos.
+    Python puro y más que lineal en paneles densos (la cola se llena): medido entre
+    ~0.1 y 0.32 s con 10k puntos y entre ~0.2 y 0.96 s con 20k, según la distribución.
+    """
+    n = len(x)
+    order = np.argsort(x, kind="stable")
+    xs = x[order].tolist()
+    ys = [0.0] * n
+    d2 = diameter * diameter
+    active = deque()   # (x, y) ya ubicados dentro del ancho, ordenados por x
+    for i, xi in enumerate(xs):
+        while active and active[0][0] <= xi - diameter:
+            active.popleft()
+        intervals = []
+        blocked = False
+        for xj, yj in active:
+            dx = xi - xj
+            h = math.sqrt(d2 - dx * dx)
+            intervals.append((yj - h, yj + h))
+            # intervalos abiertos: un punto apoyado en el borde no cuenta como choque
+            blocked = blocked or (yj - h < 0 < yj + h)
+        y = 0.0
+        if blocked:
+            intervals.sort()
+            g_lo, g_hi = intervals[0]
+            for lo, hi in intervals[1:]:
+                if lo < g_hi:
+                    g_hi = max(g_hi, hi)
+                    continue
+                if g_lo < 0 < g_hi:
+                    break
+                g_lo, g_hi = lo, hi
+            y = g_lo if -g_lo < g_hi else g_hi
+        if -limit < y < limit:
+            active.append((xi, y))
+        else:
+            y = limit if y > 0 else -limit
+        ys[i] = y
+    out = np.empty(n)
+    out[order] = ys
+    return out
+
+
+class SwarmCollection(PathCollection):
+    """
+    Puntos del beeswarm como una sola PathCollection. El layout se calcula al dibujar
+    (en píxeles, así respeta dpi / tamaño final) y se cachea por escala de los ejes;
+    los puntos que no entran en el ancho se apilan en el borde, como en seaborn.
+    """
+
+    def __init__(self, ax, x: np.ndarray, size: float, width: float, **kwargs):
+        marker = MarkerStyle("o")
+        super().__init__(
+            (marker.get_path().transformed(marker.get_transform()),), sizes=[size ** 2],
+            offsets=np.column_stack([x, np.zeros(len(x))]), offset_transform=ax.transData, **kwargs,
         )
+        self.set_transform(IdentityTransform())
+        self.x = x
+        self.size = size
+        self.width = width
+        self._layout: dict = {}
+
+    def draw(self, renderer):
+        ax = self.axes
+        if len(self.x) and self.get_visible():
+            diameter = renderer.points_to_pixels(self.size)
+            # en píxeles el layout sólo depende de la escala de los ejes relativa al diámetro
+            x0, x1 = ax.transData.transform([[0, 0], [1, 0]])[:, 0]
+            y0, y1 = ax.transData.transform([[0, 0], [0, 1]])[:, 1]
+            per_data = (y1 - y0) / diameter
+            key = (round(float(x1 - x0) / diameter, 9), round(float(per_data), 9))
+            if key not in self._layout:
+                self._layout = {key: swarm_layout(self.x * key[0], 1.0, limit=self.width / 2 * per_data)}
+            y = np.clip(self._layout[key] / per_data, -self.width / 2, self.width / 2)
+            self.set_offsets(np.column_stack([self.x, y]))
+        super().draw(renderer)
+
+
+def plot_bees(ax, bees: MetricBees, palette: dict, size: float = 6, width: float = 0.8) -> SwarmCollection:
+    """Beeswarm horizontal centrado en y=0 (ver SwarmCollection)."""
+    colors = np.array([palette[c] for c in CLASSES], dtype=object)[bees.classes]
+    points = SwarmCollection(ax, bees.values, size, width, facecolors=list(colors), edgecolors="face",
+                             linewidths=0, zorder=3)
+    ax.add_collection(points)
+    ax.autoscale_view()
+    return points
 
 
 def _add_callout(ax, x_val: float, y_val: float, text: str, font: Optional[FontProperties] = None,
@@ -79,7 +172,7 @@ def _add_callout(ax, x_val: float, y_val: float, text: str, font: Optional[FontP
     ax.add_patch(curva)
 
 
-def _highlight_players(ax, aux_df: pd.DataFrame, players: Sequence[str], font: Optional[FontProperties] = None,
+def _highlight_players(ax, bees: MetricBees, players: Sequence[str], font: Optional[FontProperties] = None,
                        show_labels: bool = True, label_y_offsets: tuple = (0.30, 0.55), curve_rad: float = 0.30):
     """Destaca 1 o 2 jugadores en el mismo gráfico."""
     if not players:
@@ -87,10 +180,10 @@ def _highlight_players(ax, aux_df: pd.DataFrame, players: Sequence[str], font: O
     players = [p for p in players if p is not None][:2]
 
     for idx, p in enumerate(players):
-        fila = aux_df[aux_df["Jugador"].str.strip() == str(p).strip()]
-        if fila.empty:
+        hits = np.flatnonzero(bees.players == str(p).strip())
+        if not len(hits):
             continue
-        x_val = float(fila["valor"].values[0])
+        x_val = float(bees.values[hits[0]])
         y_val = 0.0
         color = HILITE_COLORS[idx % len(HILITE_COLORS)]
 
@@ -110,94 +203,87 @@ def _highlight_players(ax, aux_df: pd.DataFrame, players: Sequence[str], font: O
             )
 
 
-def _aux_df_for_metric(df: pd.DataFrame, metric: str, player_col: str, lower_is_better: Set[str],
-                       p_low: float, p_high: float) -> tuple[pd.DataFrame, float, float]:
-    s = df[metric]
-    p1 = float(s.quantile(p_low))
-    p2 = float(s.quantile(p_high))
-
-    def clasificar(v):
-        if pd.isna(v):
-            return "gris"
-        if metric in lower_is_better:
-            # invertido: bajo=verde, alto=rojo
-            if v <= p1:
-                return "verde"
-            elif v <= p2:
-                return "amarillo"
-            else:
-                return "rojo"
-        else:
-            # normal: bajo=rojo, alto=verde
-            if v <= p1:
-                return "rojo"
-            elif v <= p2:
-                return "amarillo"
-            else:
-                return "verde"
-
-    aux_df = pd.DataFrame({
-        "Jugador": df[player_col].astype(str),
-        "valor": s.astype(float),
-        "color": s.apply(clasificar),
-    })
-    return aux_df, p1, p2
-
-
-def beeswarm_single(
+def prepare_bees(
     df: pd.DataFrame,
-    metric: str,
+    metrics: Sequence[str],
     player_col: str = "Jugador",
-    player: Optional[Union[List[str], str]] = None,
     lower_is_better: Set[str] | None = None,
     p_low: float = 0.33,
     p_high: float = 0.67,
-    font: Optional[FontProperties] = None,
-    point_size: float = 6,
-    show_player_label: bool = True,
-    label_y_offset: float = 0.30,
-    curve_rad: float = 0.30,
-):
+    cuts: Optional[Mapping[str, tuple]] = None,
+    percentiles: Optional[pd.DataFrame] = None,
+) -> dict[str, MetricBees]:
+    """
+    Clasificación rojo/amarillo/verde de todas las métricas en un paso: una matriz
+    float64, una llamada a nanquantile para los cortes que falten y binning
+    vectorizado (<= p1, <= p2, > p2). Se calcula una vez y la usan todos los paneles.
+    percentiles: percentil 0-100 por fila (alineado con df, ver src/percentiles.py);
+    las métricas que traiga se colorean por p_low/p_high de su grupo, no de la muestra.
+    """
     lower_is_better = lower_is_better or set()
+    metrics = [m for m in metrics if m in df.columns and pd.api.types.is_numeric_dtype(df[m])]
+    if not metrics:
+        return {}
+    arr = df[metrics].to_numpy(dtype="float64", na_value=np.nan)
+    names = df[player_col].astype(str).str.strip().to_numpy() if player_col in df.columns else np.full(len(df), "", dtype=object)
+
+    # cortes precalculados (sketches por partición, ver src/sketches.py) o quantiles exactos de una vez
+    cuts = cuts or {}
+    q = np.full((2, len(metrics)), np.nan)
+    missing = [j for j, m in enumerate(metrics) if m not in cuts]
+    if missing:
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", RuntimeWarning)
+            q[:, missing] = np.nanquantile(arr[:, missing], [p_low, p_high], axis=0)
+    for j, m in enumerate(metrics):
+        if m in cuts:
+            q[:, j] = [float(v) for v in cuts[m]]
+
+    # 0 = bajo, 1 = medio, 2 = alto; invertido para "menos es mejor"
+    with np.errstate(invalid="ignore"):
+        level = (arr > q[0]).astype(np.uint8) + (arr > q[1])
+    sin_pct = np.zeros(arr.shape, dtype=bool)
+    if percentiles is not None:
+        have = [j for j, m in enumerate(metrics) if m in percentiles.columns]
+        pct = percentiles[[metrics[j] for j in have]].to_numpy(dtype="float64", na_value=np.nan)
+        with np.errstate(invalid="ignore"):
+            level[:, have] = (pct > p_low * 100).astype(np.uint8) + (pct > p_high * 100)
+        sin_pct[:, have] = np.isnan(pct)
+        # el color sale del percentil dentro de cada grupo: no hay un corte único que dibujar
+        q[:, have] = np.nan
+    lower = np.array([m in lower_is_better for m in metrics])
+    classes = np.where(lower, 2 - level, level).astype(np.uint8)
+    classes[sin_pct] = 3   # gris: valor sin percentil de grupo
+
+    out = {}
+    for j, m in enumerate(metrics):
+        ok = ~np.isnan(arr[:, j])
+        out[m] = MetricBees(
+            metric=m,
+            values=arr[ok, j],
+            classes=classes[ok, j],
+            players=names[ok],
+            p1=float(q[0, j]),
+            p2=float(q[1, j]),
+            lower_is_better=bool(lower[j]),
+        )
+    return out
 
-    df_use = df[[player_col, metric]].dropna(subset=[metric]).copy()
-    aux_df, p1, p2 = _aux_df_for_metric(df_use, metric, player_col, lower_is_better, p_low, p_high)
 
-    fig = plt.figure(figsize=(8, 3), facecolor=BG)
-    ax = fig.add_subplot(111)
+def _draw_panel(ax, bees: MetricBees, font: Optional[FontProperties], point_size: float, title_size: int):
+    """Capa estática de un panel: swarm, cortes, título y ejes (sin destacados)."""
     ax.set_facecolor(BG)
-
-    plot_bees(ax, aux_df, palette=DEFAULT_PALETTE, size=point_size)
-
-    # Líneas percentiles (colores como tu notebook)
-    if metric in lower_is_better:
-        ax.axvline(p1, color="green", linestyle="--", linewidth=1, alpha=0.6)
-        ax.axvline(p2, color="red", linestyle="--", linewidth=1, alpha=0.6)
+    swarm = plot_bees(ax, bees, palette=DEFAULT_PALETTE, size=point_size)
+
+    # Líneas percentiles (colores como tu notebook); sin cortes (percentil por grupo) no se dibujan
+    low_color, high_color = ("green", "red") if bees.lower_is_better else ("red", "green")
+    for cut, color in ((bees.p1, low_color), (bees.p2, high_color)):
+        if np.isfinite(cut):
+            ax.axvline(cut, color=color, linestyle="--", linewidth=1, alpha=0.6)
+    if bees.lower_is_better:
         ax.invert_xaxis()
-    else:
-        ax.axvline(p1, color="red", linestyle="--", linewidth=1, alpha=0.6)
-        ax.axvline(p2, color="green", linestyle="--", linewidth=1, alpha=0.6)
-
-    # Highlight 0/1/2
-    players = []
-    if player is None:
-        players = []
-    elif isinstance(player, str):
-        players = [player]
-    else:
-        players = list(player)
-
-    _highlight_players(
-        ax,
-        aux_df,
-        players=players,
-        font=font,
-        show_labels=show_player_label,
-        label_y_offsets=(label_y_offset, label_y_offset + 0.25),
-        curve_rad=curve_rad,
-    )
 
-    ax.set_title(metric, fontsize=14, fontproperties=font, color=FG)
+    ax.set_title(bees.metric, fontsize=title_size, fontproperties=font, color=FG)
     ax.set_yticks([])
     ax.set_xlabel("")
     ax.set_ylabel("")
@@ -207,8 +293,140 @@ def beeswarm_single(
     ax.spines["left"].set_color(FG)
     ax.tick_params(axis="x", colors=FG)
     ax.set_ylim(-0.5, 0.8)
+    return swarm
+
+
+def _as_players(player) -> list:
+    if player is None:
+        return []
+    if isinstance(player, str):
+        return [player]
+    return list(player)
+
+
+def _pixel_box(bbox, height: int) -> tuple[int, int, int, int]:
+    """Bbox de display (origen abajo) -> (x0, y0, x1, y1) enteros en filas de imagen (origen arriba)."""
+    x0, x1 = max(int(np.floor(bbox.x0)), 0), int(np.ceil(bbox.x1))
+    y0, y1 = max(int(np.floor(height - bbox.y1)), 0), int(np.ceil(height - bbox.y0))
+    return x0, y0, x1, min(y1, height)
+
+
+_pool: RenderPool | None = None
+_pool_lock = threading.Lock()
+
+
+def _render_pool() -> RenderPool:
+    """Workers de render compartidos (subprocesos, ver src/charts/render_worker.py)."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = RenderPool(RENDER_WORKERS)
+        return _pool
+
+
+class BeeswarmLayers(LayeredFigure):
+    """
+    Figura de beeswarm en dos capas. La estática (swarms, cortes, títulos) se
+    rasteriza una vez por dpi; por cada jugador sólo se agregan y dibujan sus
+    destacados encima y se quitan (ver LayeredFigure).
+    Con parallel (sólo si FOOTBALL_RENDER_WORKERS > 1; por defecto no), cada swarm de
+    la capa estática se rasteriza en un proceso aparte, con los mismos píxeles que en serie.
+    """
+
+    def __init__(self, fig, panels: list, font: Optional[FontProperties] = None, show_labels: bool = True,
+                 label_y_offsets: tuple = (0.30, 0.55), curve_rad: float = 0.30, parallel: Optional[bool] = None):
+        super().__init__(fig)
+        self.panels = panels            # [(ax, MetricBees, colección del swarm)]
+        # None = automático: varios paneles con muchos puntos y más de un worker disponible
+        if parallel is None:
+            parallel = len(panels) > 1 and sum(len(b.values) for _, b, _ in panels) >= PARALLEL_MIN_POINTS
+        self.parallel = parallel and RENDER_WORKERS > 1
+        self.font = font
+        self.show_labels = show_labels
+        self.label_y_offsets = label_y_offsets
+        self.curve_rad = curve_rad
+
+    def add(self, players=None) -> list:
+        """Agrega los destacados de players a todos los paneles; devuelve los artists nuevos."""
+        players = _as_players(players)
+        artists = []
+        for ax, bees, _ in self.panels:
+            before = set(ax.get_children())
+            _highlight_players(ax, bees, players=players, font=self.font, show_labels=self.show_labels,
+                               label_y_offsets=self.label_y_offsets, curve_rad=self.curve_rad)
+            artists += [(ax, a) for a in ax.get_children() if a not in before]
+        return artists
+
+    def _patches(self) -> list:
+        return [self.fig.patch] + [ax.patch for ax, _, _ in self.panels]
+
+    def _draw_static(self, canvas):
+        if self.parallel:
+            self._draw_parallel(canvas)
+        else:
+            canvas.draw()
+
+    def _draw_parallel(self, canvas):
+        """
+        Fondo sin swarms en este proceso; cada worker dibuja su swarm sobre el recorte
+        de ese fondo (mismos píxeles de mezcla que en serie) y se copia de vuelta.
+        """
+        swarms = [swarm for _, _, swarm in self.panels]
+        for swarm in swarms:
+            swarm.set_visible(False)
+        try:
+            canvas.draw()
+        finally:
+            for swarm in swarms:
+                swarm.set_visible(True)
+        fig = self.fig
+        img = np.asarray(canvas.buffer_rgba())
+        boxes = [_pixel_box(ax.bbox, img.shape[0]) for ax, _, _ in self.panels]
+        tasks = [
+            (img[y0:y1, x0:x1].copy(), x0, y0, bees.values, bees.classes, swarm.get_sizes()[0] ** 0.5,
+             tuple(fig.get_size_inches()), tuple(ax.get_position().bounds), ax.get_xlim(), ax.get_ylim(), fig.dpi)
+            for (ax, bees, swarm), (x0, y0, x1, y1) in zip(self.panels, boxes)
+        ]
+        try:
+            results = _render_pool().map(tasks)
+        except (OSError, RuntimeError):
+            # sin workers (entorno sin subprocesos, worker caído o error de render): mismo resultado en serie
+            canvas.draw()
+            return
+        for (x0, y0, x1, y1), rgba in zip(boxes, results):
+            img[y0:y1, x0:x1] = rgba
+
+
+def beeswarm_single(
+    df: pd.DataFrame,
+    metric: str,
+    player_col: str = "Jugador",
+    player: Optional[Union[List[str], str]] = None,
+    lower_is_better: Set[str] | None = None,
+    p_low: float = 0.33,
+    p_high: float = 0.67,
+    font: Optional[FontProperties] = None,
+    point_size: float = 6,
+    show_player_label: bool = True,
+    cuts: Optional[Mapping[str, tuple]] = None,
+    label_y_offset: float = 0.30,
+    curve_rad: float = 0.30,
+    prepared: Optional[Mapping[str, MetricBees]] = None,
+    layered: bool = False,
+):
+    if prepared is None or metric not in prepared:
+        prepared = prepare_bees(df, [metric], player_col, lower_is_better, p_low, p_high, cuts)
+
+    fig = plt.figure(figsize=(8, 3), facecolor=BG)
+    ax = fig.add_subplot(111)
+    swarm = _draw_panel(ax, prepared[metric], font, point_size, title_size=14)
 
     fig.tight_layout()
+    layers = BeeswarmLayers(fig, [(ax, prepared[metric], swarm)], font, show_player_label,
+                            (label_y_offset, label_y_offset + 0.25), curve_rad)
+    if layered:
+        return layers
+    layers.add(player)
     return fig
 
 
@@ -223,60 +441,37 @@ def beeswarm_grid(
     p_high: float = 0.67,
     font: Optional[FontProperties] = None,
     point_size: float = 5,
+    cuts: Optional[Mapping[str, tuple]] = None,
+    prepared: Optional[Mapping[str, MetricBees]] = None,
+    layered: bool = False,
+    parallel: Optional[bool] = None,
 ):
-    lower_is_better = lower_is_better or set()
-    metrics = [m for m in metrics if m in df.columns and np.issubdtype(df[m].dtype, np.number)]
+    metrics = [m for m in metrics if m in df.columns and pd.api.types.is_numeric_dtype(df[m])]
     if not metrics:
         fig = plt.figure(figsize=(8, 3), facecolor=BG)
-        return fig
+        return BeeswarmLayers(fig, []) if layered else fig
+    if prepared is None or any(m not in prepared for m in metrics):
+        prepared = prepare_bees(df, metrics, player_col, lower_is_better, p_low, p_high, cuts)
 
     n = len(metrics)
     nrows = int(np.ceil(n / ncols))
     fig, axes = plt.subplots(nrows=nrows, ncols=ncols, figsize=(6*ncols, 3*nrows), facecolor=BG)
     axes = np.array(axes).reshape(-1)
 
-    players = []
-    if player is None:
-        players = []
-    elif isinstance(player, str):
-        players = [player]
-    else:
-        players = list(player)
-
+    panels = []
     for i, metric in enumerate(metrics):
-        ax = axes[i]
-        ax.set_facecolor(BG)
-        df_use = df[[player_col, metric]].dropna(subset=[metric]).copy()
-        aux_df, p1, p2 = _aux_df_for_metric(df_use, metric, player_col, lower_is_better, p_low, p_high)
-
-        plot_bees(ax, aux_df, palette=DEFAULT_PALETTE, size=point_size)
-
-        if metric in lower_is_better:
-            ax.axvline(p1, color="green", linestyle="--", linewidth=1, alpha=0.6)
-            ax.axvline(p2, color="red", linestyle="--", linewidth=1, alpha=0.6)
-            ax.invert_xaxis()
-        else:
-            ax.axvline(p1, color="red", linestyle="--", linewidth=1, alpha=0.6)
-            ax.axvline(p2, color="green", linestyle="--", linewidth=1, alpha=0.6)
-
-        _highlight_players(ax, aux_df, players=players, font=font, show_labels=True, label_y_offsets=(0.30, 0.55), curve_rad=0.30)
-
-        ax.set_title(metric, fontsize=10, fontproperties=font, color=FG)
-        ax.set_yticks([])
-        ax.set_xlabel("")
-        ax.set_ylabel("")
-        ax.spines["top"].set_visible(False)
-        ax.spines["right"].set_visible(False)
-        ax.spines["bottom"].set_color(FG)
-        ax.spines["left"].set_color(FG)
-        ax.tick_params(axis="x", colors=FG)
-        ax.set_ylim(-0.5, 0.8)
+        swarm = _draw_panel(axes[i], prepared[metric], font, point_size, title_size=10)
+        panels.append((axes[i], prepared[metric], swarm))
 
     # remove unused axes
     for j in range(len(metrics), len(axes)):
         fig.delaxes(axes[j])
 
     fig.tight_layout()
+    layers = BeeswarmLayers(fig, panels, font, parallel=parallel)
+    if layered:
+        return layers
+    layers.add(player)
     return fig
 
 
@@ -293,60 +488,32 @@ def beeswarm_grid_preset(
     font: Optional[FontProperties] = None,
     point_size: float = 5,
     show_player_label: bool = True,
+    cuts: Optional[Mapping[str, tuple]] = None,
     label_y_offset: float = 0.30,
     curve_rad: float = 0.30,
+    prepared: Optional[Mapping[str, MetricBees]] = None,
+    layered: bool = False,
+    parallel: Optional[bool] = None,
 ):
-    lower_is_better = lower_is_better or set()
-    metrics = [m for m in metrics if m in df.columns and np.issubdtype(df[m].dtype, np.number)]
+    metrics = [m for m in metrics if m in df.columns and pd.api.types.is_numeric_dtype(df[m])]
     metrics = metrics[: nrows*ncols]
+    if prepared is None or any(m not in prepared for m in metrics):
+        prepared = prepare_bees(df, metrics, player_col, lower_is_better, p_low, p_high, cuts)
     fig, axes = plt.subplots(nrows=nrows, ncols=ncols, figsize=(6*ncols, 3*nrows), facecolor=BG)
     axes = axes.flatten()
 
-    players = []
-    if player is None:
-        players = []
-    elif isinstance(player, str):
-        players = [player]
-    else:
-        players = list(player)
-
+    panels = []
     for i, metric in enumerate(metrics):
-        ax = axes[i]
-        ax.set_facecolor(BG)
-
-        df_use = df[[player_col, metric]].dropna(subset=[metric]).copy()
-        aux_df, p1, p2 = _aux_df_for_metric(df_use, metric, player_col, lower_is_better, p_low, p_high)
-
-        plot_bees(ax, aux_df, palette=DEFAULT_PALETTE, size=point_size)
-
-        if metric in lower_is_better:
-            ax.axvline(p1, color="green", linestyle="--", linewidth=1, alpha=0.6)
-            ax.axvline(p2, color="red", linestyle="--", linewidth=1, alpha=0.6)
-            ax.invert_xaxis()
-        else:
-            ax.axvline(p1, color="red", linestyle="--", linewidth=1, alpha=0.6)
-            ax.axvline(p2, color="green", linestyle="--", linewidth=1, alpha=0.6)
-
-        _highlight_players(
-            ax, aux_df, players=players, font=font,
-            show_labels=show_player_label,
-            label_y_offsets=(label_y_offset, label_y_offset + 0.25),
-            curve_rad=curve_rad
-        )
-
-        ax.set_title(metric, fontsize=10, fontproperties=font, color=FG)
-        ax.set_yticks([])
-        ax.set_xlabel("")
-        ax.set_ylabel("")
-        ax.spines["top"].set_visible(False)
-        ax.spines["right"].set_visible(False)
-        ax.spines["bottom"].set_color(FG)
-        ax.spines["left"].set_color(FG)
-        ax.tick_params(axis="x", colors=FG)
-        ax.set_ylim(-0.5, 0.8)
+        swarm = _draw_panel(axes[i], prepared[metric], font, point_size, title_size=10)
+        panels.append((axes[i], prepared[metric], swarm))
 
     for j in range(len(metrics), len(axes)):
         fig.delaxes(axes[j])
 
     fig.tight_layout()
+    layers = BeeswarmLayers(fig, panels, font, show_player_label,
+                            (label_y_offset, label_y_offset + 0.25), curve_rad, parallel=parallel)
+    if layered:
+        return layers
+    layers.add(player)
     return fig
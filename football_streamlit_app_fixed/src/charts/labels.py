@@ -0,0 +1,193 @@
+from __future__ import annotations
+
+from typing import Sequence
+
+import numpy as np
+from matplotlib.font_manager import findfont, get_font
+from matplotlib import ft2font
+
+DEFAULT_OFFSET = (14, 10)                     # offset points del layout original (arriba a la derecha)
+RADII = (1.0, 2.0, 3.5)                       # múltiplos del offset base; > 1 lleva línea guía
+DIRECTIONS = ("NE", "NW", "SE", "SW", "N", "S", "E", "W")
+# matplotlib >= 3.10 expone el enum LoadFlags; antes, constantes sueltas del módulo
+NO_HINTING = ft2font.LoadFlags.NO_HINTING if hasattr(ft2font, "LoadFlags") else ft2font.LOAD_NO_HINTING
+
+
+class BoxGrid:
+    """Índice en grilla uniforme de cajas ya ubicadas (x0, y0, x1, y1 en píxeles)."""
+
+    def __init__(self, cell: float):
+        self.cell = cell
+        self.cells: dict[tuple[int, int], list[int]] = {}
+        self.boxes: list[tuple] = []
+
+    def _keys(self, box):
+        c = self.cell
+        for ix in range(int(box[0] // c), int(box[2] // c) + 1):
+            for iy in range(int(box[1] // c), int(box[3] // c) + 1):
+                yield ix, iy
+
+    def insert(self, box):
+        k = len(self.boxes)
+        self.boxes.append(box)
+        for key in self._keys(box):
+            self.cells.setdefault(key, []).append(k)
+
+    def overlaps(self, box) -> bool:
+        for key in self._keys(box):
+            for k in self.cells.get(key, ()):
+                b = self.boxes[k]
+                if box[0] < b[2] and b[0] < box[2] and box[1] < b[3] and b[1] < box[3]:
+                    return True
+        return False
+
+
+class PointGrid:
+    """Puntos fijos (n x 2, píxeles) agrupados por celda con un solo argsort."""
+
+    def __init__(self, xy: np.ndarray, cell: float):
+        self.cell = cell
+        self.xy = xy
+        cells = np.floor(xy / cell).astype(np.int64)
+        order = np.lexsort((cells[:, 1], cells[:, 0]))
+        keys, starts, counts = np.unique(cells[order], axis=0, return_index=True, return_counts=True)
+        self.order = order
+        self.slices = {(int(kx), int(ky)): (s, s + n) for (kx, ky), s, n in zip(keys, starts, counts)}
+
+    def count(self, box) -> int:
+        c = self.cell
+        total = 0
+        for ix in range(int(box[0] // c), int(box[2] // c) + 1):
+            for iy in range(int(box[1] // c), int(box[3] // c) + 1):
+                sl = self.slices.get((ix, iy))
+                if sl is None:
+                    continue
+                p = self.xy[self.order[sl[0]:sl[1]]]
+                total += int(np.count_nonzero(
+                    (p[:, 0] > box[0]) & (p[:, 0] < box[2]) & (p[:, 1] > box[1]) & (p[:, 1] < box[3])
+                ))
+        return total
+
+
+class TextMeter:
+    """
+    Ancho/alto de textos de una línea sumando avances de glifo cacheados por fuente.
+    El layout completo de matplotlib cuesta ~1 ms por texto; esto es un lookup por
+    carácter, calibrado con una medición real por fuente.
+    """
+
+    def __init__(self, renderer):
+        self.renderer = renderer
+        self._fonts: dict = {}
+        self._files: dict = {}
+
+    def _font(self, prop):
+        pkey = hash(prop)
+        if pkey not in self._files:
+            self._files[pkey] = (findfont(prop), prop.get_size_in_points())
+        key = self._files[pkey]
+        if key not in self._fonts:
+            font = get_font(key[0])
+            font.set_size(key[1], self.renderer.dpi)
+            sample = "Jugador Áéíóúñ"
+            w, h, _ = self.renderer.get_text_width_height_descent(sample, prop, ismath=False)
+            entry = {"font": font, "advances": {}, "height": h, "scale": 1.0}
+            self._fonts[key] = entry
+            entry["scale"] = w / max(self._advance(entry, sample), 1e-6)
+        return self._fonts[key]
+
+    @staticmethod
+    def _advance(entry, text: str) -> float:
+        adv = entry["advances"]
+        total = 0.0
+        for ch in text:
+            if ch not in adv:
+                adv[ch] = entry["font"].load_char(ord(ch), flags=NO_HINTING).linearHoriAdvance / 65536
+            total += adv[ch]
+        return total
+
+    def size(self, text: str, prop) -> tuple[float, float]:
+        entry = self._font(prop)
+        return self._advance(entry, text) * entry["scale"], entry["height"]
+
+
+def _candidates(w: float, h: float, base: tuple) -> list[tuple[float, float, bool]]:
+    """Esquinas inferiores-izquierdas candidatas (relativas al punto, píxeles) y si llevan guía."""
+    out = []
+    for r in RADII:
+        dx, dy = base[0] * r, base[1] * r
+        pos = {
+            "NE": (dx, dy), "NW": (-dx - w, dy), "SE": (dx, -dy - h), "SW": (-dx - w, -dy - h),
+            "N": (-w / 2, dy * 1.4), "S": (-w / 2, -dy * 1.4 - h), "E": (dx * 1.2, -h / 2), "W": (-dx * 1.2 - w, -h / 2),
+        }
+        out += [(*pos[d], r > 1) for d in DIRECTIONS]
+    return out
+
+
+def place_labels(ax, labels: Sequence, points: np.ndarray, leader_color: str = "white") -> None:
+    """
+    Reubica anotaciones (ha=left, va=bottom, textcoords='offset points') para que no
+    se pisen entre sí ni tapen puntos. Van en orden de prioridad: cada una toma el
+    primer candidato sin choque con etiquetas ya ubicadas y con menos puntos debajo;
+    si se aleja del punto, se dibuja una línea guía. points: (n, 2) en datos.
+    Llamar después de tight_layout (trabaja en píxeles de la figura final).
+    """
+    if not labels:
+        return
+    fig = ax.figure
+    renderer = fig.canvas.get_renderer()
+    px = fig.dpi / 72.0
+    base = (DEFAULT_OFFSET[0] * px, DEFAULT_OFFSET[1] * px)
+    fx0, fy0, fx1, fy1 = ax.get_window_extent(renderer).extents
+
+    xy = ax.transData.transform(points[np.isfinite(points).all(axis=1)]) if len(points) else np.empty((0, 2))
+    anchors = ax.transData.transform(np.array([a.xy for a in labels], dtype=float))
+    # etiquetas sobre puntos sin coordenadas (NaN) no se dibujan: no ocupan lugar
+    keep = np.isfinite(anchors).all(axis=1)
+    labels = [a for a, k in zip(labels, keep) if k]
+    anchors = anchors[keep]
+    if not labels:
+        return
+    meter = TextMeter(renderer)
+    sizes = []
+    for a in labels:
+        # caja del texto + pad del bbox redondeado (0.3 * fontsize)
+        w, h = meter.size(a.get_text(), a.get_fontproperties())
+        pad = 0.3 * a.get_fontsize() * px + 1
+        sizes.append((w + 2 * pad, h + 2 * pad, pad))
+
+    cell = max(np.median([s[0] for s in sizes]), np.median([s[1] for s in sizes]), 1.0)
+    placed = BoxGrid(cell)
+    dots = PointGrid(xy, cell)
+
+    for a, (ax_x, ax_y), (w, h, pad) in zip(labels, anchors, sizes):
+        best = None
+        for dx, dy, leader in _candidates(w, h, base):
+            box = (ax_x + dx, ax_y + dy, ax_x + dx + w, ax_y + dy + h)
+            if box[0] < fx0 or box[2] > fx1 or box[1] < fy0 or box[3] > fy1:
+                continue
+            if placed.overlaps(box):
+                continue
+            cost = dots.count(box)
+            if best is None or cost < best[0]:
+                best = (cost, dx, dy, leader, box)
+                if cost == 0:
+                    break
+        if best is None:
+            # sin lugar libre: queda en el offset original
+            dx, dy, leader = base[0], base[1], False
+            box = (ax_x + dx, ax_y + dy, ax_x + dx + w, ax_y + dy + h)
+        else:
+            _, dx, dy, leader, box = best
+        placed.insert(box)
+        # el texto se ancla en la esquina inferior izquierda, dentro del pad del bbox
+        a.xyann = ((dx + pad) / px, (dy + pad) / px)
+        if leader:
+            # guía hasta el borde más cercano de la caja
+            tx = min(max(ax_x, box[0]), box[2])
+            ty = min(max(ax_y, box[1]), box[3])
+            ax.annotate(
+                "", a.xy, xytext=((tx - ax_x) / px, (ty - ax_y) / px), textcoords="offset points",
+                arrowprops=dict(arrowstyle="-", color=leader_color, lw=0.6, alpha=0.7, shrinkA=0, shrinkB=4),
+                zorder=a.get_zorder() - 0.1,
+            )
@@ -0,0 +1,131 @@
+from __future__ import annotations
+
+import io
+import threading
+from contextlib import contextmanager
+
+import numpy as np
+import matplotlib.pyplot as plt
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.colors import to_rgba
+from matplotlib.text import Text
+from matplotlib.transforms import Bbox
+
+PAD_INCHES = 0.4   # mismo margen que export_utils
+CACHE_MAX_DPI = 200   # fondos cacheados sólo a dpi de vista previa; los de exportación (300) se tiran
+
+
+class LayeredFigure:
+    """
+    Figura en dos capas para exportar muchas variantes. La estática se rasteriza una
+    vez por (dpi, transparente) y se guarda con copy_from_bbox; cada variante sólo
+    agrega sus artists, los dibuja encima (blitting de Agg) y los quita.
+    Sólo se cachea hasta CACHE_MAX_DPI: a 300 dpi un fondo ocupa decenas de MB y la
+    exportación es un clic, así que se dibuja, se usa y se libera.
+    Las subclases definen add(...) -> [(ax, artist)] y, si hace falta, _draw_static.
+    """
+
+    def __init__(self, fig):
+        self.fig = fig
+        # agregar/quitar overlays muta la figura: una variante a la vez (figuras compartidas entre sesiones)
+        self.lock = threading.RLock()
+        self._backgrounds: dict = {}    # (dpi, transparent) -> (región, bbox tight en píxeles, bytes)
+
+    def add(self, *args, **kwargs) -> list:
+        raise NotImplementedError
+
+    def _patches(self) -> list:
+        return [self.fig.patch] + [ax.patch for ax in self.fig.axes]
+
+    def _draw_static(self, canvas):
+        canvas.draw()
+
+    @contextmanager
+    def highlighted(self, *args, **kwargs):
+        with self.lock:
+            artists = self.add(*args, **kwargs)
+            try:
+                yield artists
+            finally:
+                for _, a in artists:
+                    a.remove()
+
+    @property
+    def nbytes(self) -> int:
+        """Memoria aproximada retenida: fondos cacheados + el buffer del renderer (uno por fondo)."""
+        return sum(2 * size for _, _, size in self._backgrounds.values())
+
+    def _background(self, canvas, dpi: int, transparent: bool):
+        key = (dpi, transparent)
+        if key not in self._backgrounds or dpi > CACHE_MAX_DPI:
+            patches = self._patches()
+            colors = [p.get_facecolor() for p in patches]
+            if transparent:
+                for p in patches:
+                    p.set_facecolor("none")
+            try:
+                self._draw_static(canvas)
+                renderer = canvas.get_renderer()
+                tight = self.fig.get_tightbbox(renderer).padded(PAD_INCHES).transformed(self.fig.dpi_scale_trans)
+                w, h = canvas.get_width_height(physical=True)
+                background = (canvas.copy_from_bbox(self.fig.bbox), tight, 4 * w * h)
+            finally:
+                for p, c in zip(patches, colors):
+                    p.set_facecolor(c)
+            if dpi > CACHE_MAX_DPI:
+                return background
+            self._backgrounds[key] = background
+        return self._backgrounds[key]
+
+    def render(self, *args, dpi: int = 300, transparent: bool = True, fixed: bool = False, **kwargs) -> np.ndarray:
+        """
+        RGBA (uint8) de la capa estática cacheada + overlays de add(*args, **kwargs),
+        recortado tight como export_utils. fixed: recorte de la capa estática sola
+        (mismo tamaño para todas las variantes, p. ej. para componer una grilla).
+        """
+        with self.lock:
+            canvas = FigureCanvasAgg(self.fig)
+            self.fig.set_dpi(dpi)
+            region, tight, _ = self._background(canvas, dpi, transparent)
+            canvas.restore_region(region)
+            renderer = canvas.get_renderer()
+            with self.highlighted(*args, **kwargs) as artists:
+                for ax, a in artists:
+                    ax.draw_artist(a)
+                bbox = tight
+                if not fixed:
+                    extents = [a.get_window_extent(renderer) for _, a in artists]
+                    bbox = Bbox.union([tight] + [e for e in extents if np.isfinite(e.get_points()).all()])
+                img = np.asarray(canvas.buffer_rgba())
+                # recorte; el margen que cae fuera de la figura se rellena con el fondo (como savefig).
+                # Mismo tamaño que savefig (trunca ancho y alto); el origen se redondea al píxel,
+                # así que el contenido puede quedar corrido menos de un píxel respecto de export_utils.
+                h, w = img.shape[:2]
+                x0, y1 = int(np.floor(bbox.x0)), int(np.ceil(h - bbox.y0))
+                x1, y0 = x0 + int(bbox.width + 1e-6), y1 - int(bbox.height + 1e-6)   # 1360.9999 px = 1361 en savefig
+                out = np.zeros((y1 - y0, x1 - x0, 4), dtype=np.uint8)
+                if not transparent:
+                    out[:] = np.round(np.array(to_rgba(self.fig.get_facecolor())) * 255).astype(np.uint8)
+                sx0, sy0 = max(x0, 0), max(y0, 0)
+                sx1, sy1 = min(x1, w), min(y1, h)
+                out[sy0 - y0:sy1 - y0, sx0 - x0:sx1 - x0] = img[sy0:sy1, sx0:sx1]
+            if dpi > CACHE_MAX_DPI:
+                # canvas nuevo sin renderer y textos sin el último renderer (como al picklear):
+                # la figura no retiene el buffer de exportación
+                FigureCanvasAgg(self.fig)
+                for t in self.fig.findobj(Text):
+                    t._renderer = None
+        return out
+
+    def png(self, *args, dpi: int = 300, transparent: bool = True, **kwargs) -> bytes:
+        """PNG (bbox tight, como export_utils) con la capa estática cacheada + overlays."""
+        buf = io.BytesIO()
+        plt.imsave(buf, self.render(*args, dpi=dpi, transparent=transparent, **kwargs), format="png", dpi=dpi)
+        return buf.getvalue()
+
+    def svg(self, *args, **kwargs) -> str:
+        """SVG completo (vectorial: se dibuja todo, sin cache de capas)."""
+        with self.highlighted(*args, **kwargs):
+            buf = io.StringIO()
+            self.fig.savefig(buf, format="svg", transparent=True, bbox_inches="tight", pad_inches=PAD_INCHES)
+        return buf.getvalue()
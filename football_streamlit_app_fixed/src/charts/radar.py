@@ -1,16 +1,113 @@
 from __future__ import annotations
 
+import io
+import os
+import threading
+import warnings
+from collections import OrderedDict
 from dataclasses import dataclass
 from typing import List, Sequence, Optional, Dict, Tuple, Set
 
 import numpy as np
 import pandas as pd
 import matplotlib.pyplot as plt
+from matplotlib.colors import to_rgba
 from matplotlib.font_manager import FontProperties
 from mplsoccer import Radar, grid
 
+from src.charts.layers import LayeredFigure
+from src.percentiles import PercentileCube
+from src.player_index import SEASON_COL, PlayerIndex
+
 BG = "#191919"
 
+@dataclass
+class RadarValues:
+    """Rangos y valores de un radar para varios jugadores (una fila de `values` por jugador)."""
+    params: list[str]
+    low: np.ndarray
+    high: np.ndarray
+    mean: np.ndarray
+    median: np.ndarray
+    players: list[str]
+    rows: np.ndarray      # fila del dataset elegida por jugador (-1 = no encontrado)
+    seasons: list         # temporada de esa fila
+    values: np.ndarray    # jugadores x params (NaN si no encontrado)
+
+    def by_player(self) -> dict[str, list[float]]:
+        return {p: v.tolist() for p, v in zip(self.players, self.values)}
+
+
+def radar_values(
+    df: pd.DataFrame,
+    metrics: Sequence[str],
+    players: Sequence[str] = (),
+    index: Optional[PlayerIndex] = None,
+    player_col: str = "Jugador",
+    season=None,
+    q_low: float = 0.10,
+    q_high: float = 0.90,
+    quantiles: Optional[pd.DataFrame] = None,
+    cube: Optional[PercentileCube] = None,
+) -> RadarValues:
+    """
+    Valores de radar en lote: low/high/mean/median de la muestra (df) y la matriz
+    jugadores x params en un solo take. index: PlayerIndex del dataset (posiciones
+    de fila = df.index); si no se pasa, se arma uno sobre df. Sin season, cada
+    jugador toma su temporada más reciente dentro de df.
+    cube: PercentileCube del dataset; los valores pasan a ser el percentil de cada
+    jugador en su grupo (Temporada x Liga x posición) y la escala queda fija en 0-100.
+    """
+    params = [m for m in metrics if m in df.columns and pd.api.types.is_numeric_dtype(df[m])]
+    if cube is not None:
+        params = [m for m in params if m in cube.col]
+    if not params:
+        raise ValueError("No hay métricas numéricas válidas para radar.")
+
+    if cube is not None:
+        mat = cube.percentiles(df.index.to_numpy(dtype=np.int64), params).astype(float)
+    else:
+        mat = df[params].to_numpy(dtype=float, na_value=np.nan)
+
+    if cube is not None:
+        low, high = np.zeros(len(params)), np.full(len(params), 100.0)
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", RuntimeWarning)
+            median_vals = np.nanmedian(mat, axis=0)
+    elif quantiles is not None and all(p in quantiles.columns for p in params):
+        q = quantiles[params]
+        low, high, median_vals = (q.loc[k].to_numpy(dtype=float) for k in (q_low, q_high, 0.50))
+    else:
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", RuntimeWarning)
+            low, high, median_vals = np.nanquantile(mat, [q_low, q_high, 0.50], axis=0)
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)
+        mean_vals = np.nanmean(mat, axis=0)
+
+    positions = df.index.to_numpy(dtype=np.int64)
+    if index is None:
+        # índice efímero sobre df: posiciones locales
+        seasons = df[SEASON_COL].reset_index(drop=True) if SEASON_COL in df.columns else None
+        index = PlayerIndex(df[player_col].reset_index(drop=True), seasons)
+        local = index.pick(players, season)
+        rows = np.where(local >= 0, positions[np.maximum(local, 0)], -1)
+        seasons_sel = index.season_of(local)
+    else:
+        within = np.zeros(index.n_rows, dtype=bool)
+        within[positions] = True
+        rows = index.pick(players, season, within=within)
+        local = pd.Index(positions).get_indexer(rows)
+        seasons_sel = index.season_of(rows)
+
+    values = np.full((len(players), len(params)), np.nan)
+    found = local >= 0
+    values[found] = mat[local[found]]
+    return RadarValues(
+        params, low, high, mean_vals, median_vals, [str(p) for p in players], rows, seasons_sel, values,
+    )
+
+
 def prepare_radar_values(
     df: pd.DataFrame,
     metrics: Sequence[str],
@@ -19,28 +116,262 @@ def prepare_radar_values(
     lower_is_better: Set[str] | None = None,
     q_low: float = 0.10,
     q_high: float = 0.90,
+    quantiles: Optional[pd.DataFrame] = None,
+    index: Optional[PlayerIndex] = None,
+    season=None,
+    cube: Optional[PercentileCube] = None,
 ) -> tuple[list[str], list[float], list[float], list[float], list[float], dict[str, list[float]]]:
-    """Compute params, low/high (q_low/q_high), mean, median and values per player."""
-    lower_is_better = lower_is_better or set()
+    """Compute params, low/high (q_low/q_high), mean, median and values per player.
 
-    params = [m for m in metrics if m in df.columns and pd.api.types.is_numeric_dtype(df[m])]
-    if not params:
-        raise ValueError("No hay métricas numéricas válidas para radar.")
+    quantiles: optional precomputed table (index q_low, q_high, 0.5) e.g. from src.sketches.
+    index/season: see radar_values (default: most recent season per player).
+    cube: percentile ranks per season x league x position group (see src.percentiles).
+    """
+    rv = radar_values(
+        df, metrics, players, index=index, player_col=player_col, season=season,
+        q_low=q_low, q_high=q_high, quantiles=quantiles, cube=cube,
+    )
+    return (
+        rv.params, rv.low.tolist(), rv.high.tolist(), rv.mean.tolist(), rv.median.tolist(), rv.by_player(),
+    )
+
+
+DEFAULT_COLORS = ["#4b4efb", "#FB8E4B", "#109fd5", "#7AC3FF", "#FFD580"]
+TEMPLATE_CACHE_SIZE = 16
+TEMPLATE_CACHE_BYTES = int(os.environ.get("FOOTBALL_RADAR_CACHE_MB", 256)) * 1024 ** 2
+
+
+def _cycle_colors(colors: Optional[Sequence[str]], n: int) -> list[str]:
+    if colors is None:
+        colors = DEFAULT_COLORS
+    if len(colors) < n:
+        colors = list(colors) * ((n // len(colors)) + 1)
+    return list(colors)[:max(n, 1)]
+
+
+class RadarTemplate(LayeredFigure):
+    """
+    Radar en capas: la plantilla (Radar, grid, anillos, etiquetas de params) se arma
+    una vez por params + rangos; cada jugador sólo agrega polígono, burbujas de valor
+    y título (add). Sirve para plot_radar, para exportar variantes con blitting
+    (png/render) y para la hoja de plantel (radar_sheet).
+    """
+
+    def __init__(
+        self,
+        params: Sequence[str],
+        low: Sequence[float],
+        high: Sequence[float],
+        lower_is_better: Sequence[str] | None = None,
+        show_max_labels: bool = False,
+        font_thin: Optional[FontProperties] = None,
+        font_bold: Optional[FontProperties] = None,
+        figheight: float = 14,
+    ):
+        self.params = list(params)
+        self.font_thin = font_thin
+        self.font_bold = font_bold
+
+        radar = Radar(
+            list(params),
+            list(low),
+            list(high),
+            lower_is_better=list(lower_is_better) if lower_is_better else [],
+            round_int=[False]*len(params),
+            num_rings=4,
+            ring_width=1,
+            center_circle_radius=1,
+        )
+
+        fig, axs = grid(
+            figheight=figheight,
+            grid_height=0.915,
+            title_height=0.06,
+            endnote_height=0.025,
+            title_space=0,
+            endnote_space=0,
+            grid_key="radar",
+            axis=False,
+        )
+        fig.set_facecolor(BG)
+        super().__init__(fig)
+        self.radar = radar
+        self.axs = axs
+
+        radar.setup_axis(ax=axs["radar"], facecolor="None")
+
+        radar.draw_circles(
+            ax=axs["radar"],
+            facecolor="#3A3A3A",
+            edgecolor="#5A5A5A",
+            lw=1.5,
+        )
+
+        # optional max labels (high)
+        if show_max_labels:
+            num_vars = len(params)
+            angles = np.linspace(0, 2*np.pi, num_vars, endpoint=False).tolist()
+            for angle, h in zip(angles, high):
+                x = (radar.ring_width * radar.num_rings + 0.15) * np.cos(angle)
+                y = (radar.ring_width * radar.num_rings + 0.15) * np.sin(angle)
+                axs["radar"].text(
+                    x, y, f"{h:.0f}",
+                    fontsize=12, ha="center", va="center",
+                    color="white", fontproperties=font_thin
+                )
+
+        radar.draw_param_labels(
+            ax=axs["radar"],
+            fontsize=21,
+            color="#ffffff",
+            fontproperties=font_thin
+        )
+
+    def add(
+        self,
+        names: Sequence[str] = (),
+        values: Sequence[Sequence[float]] = (),
+        colors: Optional[Sequence[str]] = None,
+        title_left: str = "",
+        title_right: str = "",
+        value_labels: bool = True,
+    ) -> list:
+        """Polígonos, valores y títulos de los jugadores; devuelve los artists nuevos."""
+        assert len(names) == len(values), "names y values deben tener misma longitud"
+        colors = _cycle_colors(colors, len(names))
+        ax, ax_title = self.axs["radar"], self.axs["title"]
+        before = {ax: set(ax.get_children()), ax_title: set(ax_title.get_children())}
 
-    low = df[params].quantile(q_low).tolist()
-    high = df[params].quantile(q_high).tolist()
-    mean_vals = df[params].mean().tolist()
-    median_vals = df[params].quantile(0.50).tolist()
+        for (name, vals, color) in zip(names, values, colors):
+            _, _, vertices = self.radar.draw_radar(
+                values=list(vals),
+                ax=ax,
+                kwargs_radar={"facecolor": color, "alpha": 0.45},
+                kwargs_rings={"facecolor": "None"},
+            )
+
+            # points (una colección por jugador) + value labels
+            ax.scatter(vertices[:, 0], vertices[:, 1], c="#101010", edgecolors=color, s=80, zorder=3)
+            for (x, y), v in zip(vertices, vals if value_labels else ()):
+                r = np.sqrt(x*x + y*y)
+                ang = np.arctan2(y, x)
+                x_text = (r + 0.30) * np.cos(ang)
+                y_text = (r + 0.30) * np.sin(ang)
+
+                ax.text(
+                    x_text, y_text, f"{float(v):.2f}" if np.isfinite(v) else "NA",
+                    fontsize=10, color="white",
+                    ha="center", va="center",
+                    bbox=dict(facecolor=color, alpha=0.90, edgecolor="none", boxstyle="round,pad=0.28"),
+                )
+
+        # titles
+        if len(names) == 1:
+            ax_title.text(
+                0.5, 0.65, names[0],
+                fontsize=28, fontproperties=self.font_bold,
+                ha="center", va="center", color=colors[0],
+                bbox=dict(facecolor="none", edgecolor="none", pad=20),
+            )
+        elif len(names) >= 2:
+            left = title_left or names[0]
+            right = title_right or names[1]
+            ax_title.text(
+                0.01, 0.65, left,
+                fontsize=28, fontproperties=self.font_bold,
+                ha="left", va="center", color=colors[0],
+                bbox=dict(facecolor="none", edgecolor="none", pad=20),
+            )
+            ax_title.text(
+                0.99, 0.65, right,
+                fontsize=28, fontproperties=self.font_bold,
+                ha="right", va="center", color=colors[1],
+                bbox=dict(facecolor="none", edgecolor="none", pad=20),
+            )
+
+        return [(a, artist) for a, prev in before.items() for artist in a.get_children() if artist not in prev]
+
+
+_templates: "OrderedDict[tuple, RadarTemplate]" = OrderedDict()
+_templates_lock = threading.Lock()
+
+
+def _font_key(font: Optional[FontProperties]):
+    return None if font is None else (font.get_file(), hash(font))
 
-    vals_by_player: Dict[str, list[float]] = {}
-    for p in players:
-        row = df[df[player_col].astype(str).str.strip() == str(p).strip()]
-        if row.empty:
-            vals_by_player[str(p)] = [float("nan")] * len(params)
-        else:
-            vals_by_player[str(p)] = row[params].iloc[0].astype(float).tolist()
 
-    return params, low, high, mean_vals, median_vals, vals_by_player
+def radar_template(
+    params: Sequence[str],
+    low: Sequence[float],
+    high: Sequence[float],
+    lower_is_better: Sequence[str] | None = None,
+    show_max_labels: bool = False,
+    font_thin: Optional[FontProperties] = None,
+    font_bold: Optional[FontProperties] = None,
+) -> RadarTemplate:
+    """
+    Plantilla compartida (LRU en el proceso) por params, rangos, lower_is_better y fuentes.
+    Acotada por cantidad y por bytes de fondos cacheados (TEMPLATE_CACHE_BYTES).
+    """
+    lib = [p for p in params if p in set(lower_is_better or ())]
+    key = (
+        tuple(params), tuple(np.round(np.asarray(low, dtype=float), 9)), tuple(np.round(np.asarray(high, dtype=float), 9)),
+        tuple(lib), show_max_labels, _font_key(font_thin), _font_key(font_bold),
+    )
+    with _templates_lock:
+        if key in _templates:
+            _templates.move_to_end(key)
+            return _templates[key]
+    template = RadarTemplate(params, low, high, lib, show_max_labels, font_thin, font_bold)
+    plt.close(template.fig)   # fuera del registro de pyplot: vive en el cache
+    with _templates_lock:
+        template = _templates.setdefault(key, template)
+        _templates.move_to_end(key)
+        # los fondos crecen al renderizar: el total se mide acá, en cada alta
+        while len(_templates) > 1 and (
+            len(_templates) > TEMPLATE_CACHE_SIZE or sum(t.nbytes for t in _templates.values()) > TEMPLATE_CACHE_BYTES
+        ):
+            _templates.popitem(last=False)
+    return template
+
+
+def radar_sheet(
+    template: RadarTemplate,
+    names: Sequence[str],
+    values: Sequence[Sequence[float]],
+    ncols: int = 5,
+    colors: Optional[Sequence[str]] = None,
+    dpi: int = 40,
+    transparent: bool = False,
+    value_labels: bool = False,
+) -> bytes:
+    """
+    Hoja de plantel (small multiples): un radar por jugador sobre la misma plantilla.
+    La capa estática se rasteriza una vez; cada panel sólo dibuja su polígono y se
+    compone en una grilla. Devuelve PNG. value_labels: burbujas de valor (a dpi de
+    hoja no se leen; apagadas por defecto).
+    """
+    colors = _cycle_colors(colors, len(names))
+    tiles = [
+        template.render([name], [vals], [color], dpi=dpi, transparent=transparent, fixed=True,
+                        value_labels=value_labels)
+        for name, vals, color in zip(names, values, colors)
+    ]
+    if not tiles:
+        tiles = [template.render(dpi=dpi, transparent=transparent, fixed=True)]
+    h, w = tiles[0].shape[:2]
+    ncols = max(1, min(ncols, len(tiles)))
+    nrows = int(np.ceil(len(tiles) / ncols))
+    sheet = np.zeros((nrows * h, ncols * w, 4), dtype=np.uint8)
+    if not transparent:
+        sheet[:] = np.round(np.array(to_rgba(BG)) * 255).astype(np.uint8)
+    for k, tile in enumerate(tiles):
+        r, c = divmod(k, ncols)
+        sheet[r * h:(r + 1) * h, c * w:(c + 1) * w] = tile
+    buf = io.BytesIO()
+    # hoja grande de vista previa: compresión rápida (el encode costaba más que los radares)
+    plt.imsave(buf, sheet, format="png", dpi=dpi, pil_kwargs={"compress_level": 1})
+    return buf.getvalue()
 
 
 def plot_radar(
@@ -56,115 +387,15 @@ def plot_radar(
     font_bold: Optional[FontProperties] = None,
     title_left: str = "",
     title_right: str = "",
-) -> plt.Figure:
-    """Your style: dark bg, labels, value callouts, transparent-friendly."""
-    assert len(names) == len(values), "names y values deben tener misma longitud"
-
-    if colors is None:
-        colors = ["#4b4efb", "#FB8E4B", "#109fd5", "#7AC3FF", "#FFD580"]
-    if len(colors) < len(names):
-        colors = list(colors) * ((len(names) // len(colors)) + 1)
-        colors = colors[:len(names)]
-
-    lower_is_better = list(lower_is_better) if lower_is_better else []
-
-    radar = Radar(
-        list(params),
-        list(low),
-        list(high),
-        lower_is_better=lower_is_better,
-        round_int=[False]*len(params),
-        num_rings=4,
-        ring_width=1,
-        center_circle_radius=1,
-    )
-
-    fig, axs = grid(
-        figheight=14,
-        grid_height=0.915,
-        title_height=0.06,
-        endnote_height=0.025,
-        title_space=0,
-        endnote_space=0,
-        grid_key="radar",
-        axis=False,
-    )
-    fig.set_facecolor(BG)
-
-    radar.setup_axis(ax=axs["radar"], facecolor="None")
-
-    radar.draw_circles(
-        ax=axs["radar"],
-        facecolor="#3A3A3A",
-        edgecolor="#5A5A5A",
-        lw=1.5,
-    )
-
-    # optional max labels (high)
-    if show_max_labels:
-        num_vars = len(params)
-        angles = np.linspace(0, 2*np.pi, num_vars, endpoint=False).tolist()
-        for angle, h in zip(angles, high):
-            x = (radar.ring_width * radar.num_rings + 0.15) * np.cos(angle)
-            y = (radar.ring_width * radar.num_rings + 0.15) * np.sin(angle)
-            axs["radar"].text(
-                x, y, f"{h:.0f}",
-                fontsize=12, ha="center", va="center",
-                color="white", fontproperties=font_thin
-            )
-
-    radar.draw_param_labels(
-        ax=axs["radar"],
-        fontsize=21,
-        color="#ffffff",
-        fontproperties=font_thin
-    )
-
-    for (name, vals, color) in zip(names, values, colors):
-        _, _, vertices = radar.draw_radar(
-            values=list(vals),
-            ax=axs["radar"],
-            kwargs_radar={"facecolor": color, "alpha": 0.45},
-            kwargs_rings={"facecolor": "None"},
-        )
-
-        # value labels + points
-        for (x, y), v in zip(vertices, vals):
-            r = np.sqrt(x*x + y*y)
-            ang = np.arctan2(y, x)
-            x_text = (r + 0.30) * np.cos(ang)
-            y_text = (r + 0.30) * np.sin(ang)
-
-            axs["radar"].scatter(x, y, c="#101010", edgecolors=color, s=80, zorder=3)
-            axs["radar"].text(
-                x_text, y_text, f"{float(v):.2f}" if np.isfinite(v) else "NA",
-                fontsize=10, color="white",
-                ha="center", va="center",
-                bbox=dict(facecolor=color, alpha=0.90, edgecolor="none", boxstyle="round,pad=0.28"),
-            )
-
-    # titles
-    if len(names) == 1:
-        axs["title"].text(
-            0.5, 0.65, names[0],
-            fontsize=28, fontproperties=font_bold,
-            ha="center", va="center", color=colors[0],
-            bbox=dict(facecolor="none", edgecolor="none", pad=20),
-        )
-    elif len(names) >= 2:
-        left = title_left or names[0]
-        right = title_right or names[1]
-        axs["title"].text(
-            0.01, 0.65, left,
-            fontsize=28, fontproperties=font_bold,
-            ha="left", va="center", color=colors[0],
-            bbox=dict(facecolor="none", edgecolor="none", pad=20),
-        )
-        axs["title"].text(
-            0.99, 0.65, right,
-            fontsize=28, fontproperties=font_bold,
-            ha="right", va="center", color=colors[1],
-            bbox=dict(facecolor="none", edgecolor="none", pad=20),
-        )
+    layered: bool = False,
+):
+    """Your style: dark bg, labels, value callouts, transparent-friendly.
 
-    return fig
+    layered=True devuelve la plantilla cacheada (RadarTemplate) sin jugadores:
+    template.png(names, values, colors) / template.svg(...) por variante.
+    """
+    if layered:
+        return radar_template(params, low, high, lower_is_better, show_max_labels, font_thin, font_bold)
+    template = RadarTemplate(params, low, high, lower_is_better, show_max_labels, font_thin, font_bold)
+    template.add(names, values, colors, title_left, title_right)
+    return template.fig
@@ -0,0 +1,137 @@
+"""
+Rasterizado de swarms en procesos aparte (ver BeeswarmLayers.parallel).
+
+Los workers son subprocesos `python -m src.charts.render_worker` que leen tareas
+pickle por stdin y responden por stdout. No se usa multiprocessing: spawn vuelve a
+ejecutar __main__ en cada hijo y bajo Streamlit __main__ es la página.
+"""
+import os
+import pickle
+import queue
+import subprocess
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import numpy as np
+
+APP_ROOT = Path(__file__).resolve().parents[2]
+
+
+def render_swarm(background: np.ndarray, x0: int, y0: int, values: np.ndarray, classes: np.ndarray,
+                 size: float, figsize: tuple, position: tuple, xlim: tuple, ylim: tuple, dpi: int) -> np.ndarray:
+    """
+    Un swarm con la misma geometría de eje que el panel del proceso principal,
+    dibujado sobre background (el recorte del eje en (x0, y0), filas desde arriba).
+    El recorte se copia byte a byte al buffer de Agg (como restore_region) y el swarm
+    se dibuja encima con draw_artist: mismos píxeles de mezcla que en serie.
+    """
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+    from src.charts.bees import DEFAULT_PALETTE, MetricBees, plot_bees
+
+    fig = Figure(figsize=figsize, dpi=dpi)
+    canvas = FigureCanvasAgg(fig)
+    ax = fig.add_axes(position)
+    ax.axis("off")
+    swarm = plot_bees(ax, MetricBees("", values, classes, np.empty(0, dtype=object), np.nan, np.nan, False),
+                      palette=DEFAULT_PALETTE, size=size)
+    ax.set_xlim(xlim)
+    ax.set_ylim(ylim)
+    h, w = background.shape[:2]
+    buf = np.asarray(canvas.get_renderer().buffer_rgba())
+    buf[y0:y0 + h, x0:x0 + w] = background
+    ax.draw_artist(swarm)
+    return buf[y0:y0 + h, x0:x0 + w].copy()
+
+
+class _Worker:
+    def __init__(self):
+        self.proc = subprocess.Popen(
+            [sys.executable, "-m", "src.charts.render_worker"],
+            cwd=APP_ROOT, stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+            env={**os.environ, "MPLBACKEND": "Agg"},
+        )
+
+    def call(self, args: tuple):
+        try:
+            pickle.dump(args, self.proc.stdin, protocol=pickle.HIGHEST_PROTOCOL)
+            self.proc.stdin.flush()
+            ok, result = pickle.load(self.proc.stdout)
+        except (EOFError, pickle.UnpicklingError) as e:
+            raise OSError("worker de render terminado") from e
+        if not ok:
+            raise RuntimeError(result)
+        return result
+
+    def close(self):
+        self.proc.kill()
+        self.proc.wait()
+
+
+class RenderPool:
+    """Workers de render compartidos entre sesiones; se arrancan a demanda."""
+
+    def __init__(self, workers: int):
+        self.workers = workers
+        self._idle: queue.Queue = queue.Queue()
+        self._started = 0
+        self._lock = threading.Lock()
+        self._threads = ThreadPoolExecutor(max_workers=workers)
+
+    def _acquire(self) -> _Worker:
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock:
+            if self._started < self.workers:
+                self._started += 1
+                try:
+                    return _Worker()
+                except BaseException:
+                    self._started -= 1
+                    raise
+        return self._idle.get()
+
+    def _run(self, args: tuple):
+        worker = self._acquire()
+        try:
+            result = worker.call(args)
+        except OSError:
+            # worker caído: se descarta y el próximo pedido arranca otro
+            worker.close()
+            with self._lock:
+                self._started -= 1
+            raise
+        except BaseException:
+            self._idle.put(worker)
+            raise
+        self._idle.put(worker)
+        return result
+
+    def map(self, tasks) -> list:
+        """render_swarm(*args) por cada args de tasks, en orden."""
+        return list(self._threads.map(self._run, tasks))
+
+
+def main():
+    # stdout es el canal de respuestas: cualquier print del render va a stderr
+    inp, out = sys.stdin.buffer, sys.stdout.buffer
+    sys.stdout = sys.stderr
+    while True:
+        try:
+            args = pickle.load(inp)
+        except EOFError:
+            return
+        try:
+            reply = (True, render_swarm(*args))
+        except Exception as e:
+            reply = (False, f"{type(e).__name__}: {e}")
+        pickle.dump(reply, out, protocol=pickle.HIGHEST_PROTOCOL)
+        out.flush()
+
+
+if __name__ == "__main__":
+    main()
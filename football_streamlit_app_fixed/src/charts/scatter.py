@@ -1,28 +1,50 @@
 from __future__ import annotations
 
+import os
+from dataclasses import dataclass
 from typing import Optional, Sequence, Set, List, Tuple
-import unicodedata
 
 import numpy as np
 import pandas as pd
 import matplotlib.pyplot as plt
+from matplotlib.colors import to_rgba
 from matplotlib.font_manager import FontProperties
 
+from src.charts.labels import place_labels
+from src.dataset import LazyDataset
+from src.text_index import TextColumnIndex, normalize_text, split_terms, text_index
+
 BG = "#191919"
 FG = "white"
 
-def _norm(s):
-    if isinstance(s, str):
-        return unicodedata.normalize("NFKD", s).encode("ascii","ignore").decode("utf-8").lower()
-    return str(s).lower()
+# categorías de punto, de menor a mayor prioridad
+RESTO, TOP, EQUIPO, DESTACADO = 0, 1, 2, 3
+
+# a partir de cuántos puntos el resto se dibuja como densidad (histograma 2D)
+DENSITY_MIN_POINTS = int(os.environ.get("FOOTBALL_SCATTER_DENSITY_MIN", 20_000))
+DENSITY_BINS = (180, 120)
+MARGIN = 0.05  # mismo margen que el autoscale de matplotlib
+# etiquetas por gráfico: destacado y top-N siempre; el equipo completa el cupo por la métrica Y.
+# Un equipo "amplio" (substring de muchos nombres) llegaba a miles de etiquetas ilegibles.
+MAX_LABELS = int(os.environ.get("FOOTBALL_SCATTER_MAX_LABELS", 40))
+
+# nombre tras RENAME_MAP y el original de Wyscout
+POSITION_COLS = ("posicion", "Posición específica")
 
-def _apply_contains(df: pd.DataFrame, col: str, values: Optional[Sequence[str]]):
+def _text_mask(df: pd.DataFrame, col: str, terms: Sequence[str], ds: Optional[LazyDataset], mode: str) -> np.ndarray:
+    if ds is not None and col in ds.columns:
+        # índice del dataset (se arma una vez); df.index son posiciones de fila de ds
+        return text_index(ds, col).mask(terms, mode)[df.index.to_numpy()]
+    # normaliza sólo los valores únicos, las filas se resuelven por código
+    return TextColumnIndex(df[col]).mask(terms, mode)
+
+def _apply_contains(df: pd.DataFrame, col: str, values: Optional[Sequence[str]],
+                    ds: Optional[LazyDataset] = None, mode: str = "contains"):
     if not values:
         return df
     if col not in df.columns:
         return df
-    vals = [_norm(v) for v in values]
-    return df[df[col].astype(str).apply(lambda x: any(v in _norm(x) for v in vals))]
+    return df[_text_mask(df, col, split_terms(values), ds, mode)]
 
 def _apply_range(df: pd.DataFrame, col: str, min_v=None, max_v=None):
     if col not in df.columns:
@@ -33,6 +55,117 @@ def _apply_range(df: pd.DataFrame, col: str, min_v=None, max_v=None):
         df = df[df[col] <= max_v]
     return df
 
+@dataclass
+class ScatterData:
+    """Filas filtradas, líneas de referencia y categoría por punto; común a todos los backends."""
+    df: pd.DataFrame
+    labels: np.ndarray
+    xs: np.ndarray
+    ys: np.ndarray
+    cat: np.ndarray
+    ref_x: float
+    ref_y: float
+    ref_label: str
+
+
+def scatter_data(
+    df: pd.DataFrame,
+    x_col: str,
+    y_col: str,
+    label_col: str,
+    team_col: str,
+    jugador_destacado: Optional[str] = None,
+    equipo_resaltado: Optional[str] = None,
+    top_n: int = 5,
+    ref_type: str = "Mediana",
+    filtros: Optional[dict] = None,
+    ds: Optional[LazyDataset] = None,
+) -> ScatterData:
+    """
+    ds: dataset de df (df.index = posiciones de fila); las búsquedas de texto usan
+    su índice cacheado en vez de normalizar la columna en cada llamada.
+    """
+    f = filtros or {}
+    df_f = df.copy()
+    df_f.columns = df_f.columns.str.strip()
+
+    # categoricals (contains)
+    df_f = _apply_contains(df_f, "Temporada", f.get("temporadas"), ds)
+    df_f = _apply_contains(df_f, "País", f.get("paises"), ds)
+    df_f = _apply_contains(df_f, "Liga", f.get("ligas"), ds)
+    df_f = _apply_contains(df_f, "Jugador", f.get("jugadores"), ds)
+    df_f = _apply_contains(df_f, "Equipo", f.get("equipos"), ds)
+    df_f = _apply_contains(df_f, "Pie", f.get("pies"), ds)
+    # posiciones: lista de códigos ("CB") contra tokens ("LCB, CB" -> lcb, cb); "CB" no matchea "LCB"
+    for pos_col in POSITION_COLS:
+        df_f = _apply_contains(df_f, pos_col, f.get("posiciones"), ds, mode="token")
+
+    # ranges
+    df_f = _apply_range(df_f, "Minutos jugados", f.get("min_minutos"), f.get("max_minutos"))
+    df_f = _apply_range(df_f, "Edad", f.get("min_edad"), f.get("max_edad"))
+    df_f = _apply_range(df_f, "Altura", f.get("min_altura"), f.get("max_altura"))
+
+    # reference lines
+    if ref_type.lower().startswith("med"):
+        ref_x = float(df_f[x_col].median())
+        ref_y = float(df_f[y_col].median())
+        ref_label = "Mediana"
+    else:
+        ref_x = float(df_f[x_col].mean())
+        ref_y = float(df_f[y_col].mean())
+        ref_label = "Media"
+
+    top_pct = df_f.sort_values(by=y_col, ascending=False).head(top_n)
+    top_vol = df_f.sort_values(by=x_col, ascending=False).head(top_n)
+    destacados = pd.concat([top_pct, top_vol])[label_col].astype(str).unique().tolist()
+
+    # categoría por máscaras (destacado > equipo > top-N > resto)
+    jugadores_f = df_f[label_col].astype(str).to_numpy()
+    cat = np.where(np.isin(jugadores_f, destacados), TOP, RESTO)
+    if equipo_resaltado and team_col in df_f.columns:
+        en_equipo = _text_mask(df_f, team_col, [normalize_text(equipo_resaltado)], ds, "contains")
+        cat[en_equipo] = EQUIPO
+    if jugador_destacado:
+        cat[jugadores_f == str(jugador_destacado)] = DESTACADO
+
+    return ScatterData(
+        df_f, jugadores_f, df_f[x_col].to_numpy(), df_f[y_col].to_numpy(), cat, ref_x, ref_y, ref_label,
+    )
+
+
+def label_rows(sd: ScatterData, max_labels: int = MAX_LABELS) -> np.ndarray:
+    """Filas a etiquetar (ordenadas): destacado y top-N siempre, del equipo las de mayor Y hasta max_labels."""
+    fijas = np.flatnonzero((sd.cat == DESTACADO) | (sd.cat == TOP))
+    equipo = np.flatnonzero(sd.cat == EQUIPO)
+    cupo = max(max_labels - len(fijas), 0)
+    if len(equipo) > cupo:
+        y = np.nan_to_num(sd.ys[equipo].astype(float), nan=-np.inf)
+        equipo = equipo[np.argsort(-y, kind="stable")[:cupo]]
+    return np.sort(np.concatenate([fijas, equipo]))
+
+
+def _density_layer(ax, xs: np.ndarray, ys: np.ndarray, color, bins=DENSITY_BINS):
+    """
+    Resto de puntos como una imagen RGBA: histograma 2D con alpha en escala log.
+    Costo y tamaño de PNG/SVG fijos (una sola imagen), sin importar cuántos puntos haya.
+    """
+    ok = np.isfinite(xs) & np.isfinite(ys)
+    if not ok.any():
+        return
+    x, y = xs[ok], ys[ok]
+    x0, x1 = float(x.min()), float(x.max())
+    y0, y1 = float(y.min()), float(y.max())
+    dx = (x1 - x0) * MARGIN or 0.5
+    dy = (y1 - y0) * MARGIN or 0.5
+    extent = (x0 - dx, x1 + dx, y0 - dy, y1 + dy)
+    counts, _, _ = np.histogram2d(x, y, bins=bins, range=[extent[:2], extent[2:]])
+    dens = np.log1p(counts.T)
+    rgba = np.zeros(dens.shape + (4,))
+    rgba[..., :3] = color[:3]
+    rgba[..., 3] = np.where(counts.T > 0, 0.15 + 0.75 * dens / dens.max(), 0.0)
+    ax.imshow(rgba, extent=extent, origin="lower", aspect="auto", interpolation="nearest", zorder=1)
+
+
 def plot_scatter_v2(
     df: pd.DataFrame,
     x_col: str,
@@ -63,37 +196,26 @@ def plot_scatter_v2(
     posiciones=None,
     ref_type: str = "Mediana",
     font: Optional[FontProperties] = None,
+    auto_labels: bool = True,
+    density: Optional[bool] = None,
+    ds: Optional[LazyDataset] = None,
+    max_labels: int = MAX_LABELS,
 ):
-    df_f = df.copy()
-    df_f.columns = df_f.columns.str.strip()
-
-    # categoricals (contains)
-    df_f = _apply_contains(df_f, "Temporada", temporadas)
-    df_f = _apply_contains(df_f, "País", paises)
-    df_f = _apply_contains(df_f, "Liga", ligas)
-    df_f = _apply_contains(df_f, "Jugador", jugadores)
-    df_f = _apply_contains(df_f, "Equipo", equipos)
-    df_f = _apply_contains(df_f, "Pie", pies)
-    df_f = _apply_contains(df_f, "Posición específica", posiciones)
-
-    # ranges
-    df_f = _apply_range(df_f, "Minutos jugados", min_minutos, max_minutos)
-    df_f = _apply_range(df_f, "Edad", min_edad, max_edad)
-    df_f = _apply_range(df_f, "Altura", min_altura, max_altura)
-
-    # reference lines
-    if ref_type.lower().startswith("med"):
-        ref_x = float(df_f[x_col].median())
-        ref_y = float(df_f[y_col].median())
-        ref_label = "Mediana"
-    else:
-        ref_x = float(df_f[x_col].mean())
-        ref_y = float(df_f[y_col].mean())
-        ref_label = "Media"
-
-    top_pct = df_f.sort_values(by=y_col, ascending=False).head(top_n)
-    top_vol = df_f.sort_values(by=x_col, ascending=False).head(top_n)
-    destacados = pd.concat([top_pct, top_vol])[label_col].astype(str).unique().tolist()
+    sd = scatter_data(
+        df, x_col, y_col, label_col, team_col,
+        jugador_destacado=jugador_destacado, equipo_resaltado=equipo_resaltado,
+        top_n=top_n, ref_type=ref_type,
+        filtros=dict(
+            temporadas=temporadas, paises=paises, ligas=ligas, jugadores=jugadores, equipos=equipos,
+            pies=pies, posiciones=posiciones,
+            min_minutos=min_minutos, max_minutos=max_minutos, min_edad=min_edad, max_edad=max_edad,
+            min_altura=min_altura, max_altura=max_altura,
+        ),
+        ds=ds,
+    )
+    df_f, ref_x, ref_y, ref_label = sd.df, sd.ref_x, sd.ref_y, sd.ref_label
+    jugadores_f, xs, ys, cat = sd.labels, sd.xs, sd.ys, sd.cat
+    n = len(df_f)
 
     fig, ax = plt.subplots(figsize=(12, 8))
     fig.patch.set_facecolor(BG)
@@ -117,37 +239,44 @@ def plot_scatter_v2(
     for spine in ["bottom","left"]:
         ax.spines[spine].set_color(FG)
 
-    # plot points
-    for _, row in df_f.iterrows():
-        jugador = str(row[label_col])
-        x = row[x_col]
-        y = row[y_col]
-        equipo = str(row[team_col]) if team_col in df_f.columns else ""
-
-        etq = False
-        bbox_color = None
-        alpha = 0.85
-        if jugador_destacado and jugador == str(jugador_destacado):
-            fc, ec, sz, etq, bbox_color, alpha = color_destacado, "black", 70, True, color_destacado, 0.85
-        elif equipo_resaltado and _norm(equipo_resaltado) in _norm(equipo):
-            fc, ec, sz, etq, bbox_color, alpha = color_equipo, "black", 60, True, color_equipo, 0.95
-        elif jugador in destacados:
-            fc, ec, sz, etq, bbox_color, alpha = color_top, "black", 50, True, color_top, 0.85
-        else:
-            fc, ec, sz, etq = color_resto, "none", 30, False
-
-        ax.scatter(x, y, s=sz, c=fc, edgecolors=ec, linewidths=0.8, alpha=0.8, zorder=3)
-
-        if etq:
-            ax.annotate(
-                jugador, (x, y),
-                textcoords="offset points", xytext=(14, 10),
-                fontsize=9, ha="left", va="bottom",
-                fontweight="bold" if jugador_destacado and jugador == str(jugador_destacado) else "normal",
-                fontproperties=font,
-                color="black",
-                bbox=dict(boxstyle="round,pad=0.3", fc=bbox_color, ec=fc, lw=1, alpha=alpha),
-            )
+    # plot points: estilo por categoría
+    colores = [to_rgba(c) for c in (color_resto, color_top, color_equipo, color_destacado)]
+    sizes = (30, 50, 60, 70)
+    bordes = ("none", "black", "black", "black")
+    bbox_alpha = {TOP: 0.85, EQUIPO: 0.95, DESTACADO: 0.85}
+
+    # densidad: automática sobre DENSITY_MIN_POINTS; el resto va en una capa agregada
+    if density is None:
+        density = n >= DENSITY_MIN_POINTS
+    if density:
+        resto = cat == RESTO
+        _density_layer(ax, xs[resto].astype(float), ys[resto].astype(float), colores[RESTO])
+
+    def _puntos(idx, k: int):
+        # estilo escalar por llamada: Agg dibuja como markers
+        px, py = xs[idx], ys[idx]
+        if len(px):
+            ax.scatter(px, py, s=sizes[k], c=[colores[k]], edgecolors=bordes[k],
+                       linewidths=0.8, alpha=0.8, zorder=3)
+
+    # un scatter por categoría, las de mayor prioridad encima (como en scatter_vega)
+    for k in (RESTO, TOP, EQUIPO, DESTACADO):
+        if k != RESTO or not density:
+            _puntos(cat == k, k)
+
+    etiquetas = []
+    for i in label_rows(sd, max_labels):
+        color = colores[cat[i]]
+        etiqueta = ax.annotate(
+            jugadores_f[i], (xs[i], ys[i]),
+            textcoords="offset points", xytext=(14, 10),
+            fontsize=9, ha="left", va="bottom",
+            fontweight="bold" if cat[i] == DESTACADO else "normal",
+            fontproperties=font,
+            color="black",
+            bbox=dict(boxstyle="round,pad=0.3", fc=color, ec=color, lw=1, alpha=bbox_alpha[cat[i]]),
+        )
+        etiquetas.append((cat[i], etiqueta))
 
     ax.text(
         0.99, 0.01,
@@ -159,4 +288,8 @@ def plot_scatter_v2(
     )
 
     fig.tight_layout()
+    if auto_labels:
+        # prioridad: destacado, equipo, top-N (estable dentro de cada grupo)
+        etiquetas.sort(key=lambda e: -e[0])
+        place_labels(ax, [e for _, e in etiquetas], np.column_stack([xs, ys]).astype(float), leader_color=FG)
     return fig, df_f
@@ -0,0 +1,140 @@
+from __future__ import annotations
+
+from typing import Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from src.charts.scatter import BG, FG, MAX_LABELS, RESTO, TOP, EQUIPO, DESTACADO, label_rows, scatter_data
+from src.dataset import LazyDataset
+
+CATEGORIAS = ("Resto", "Top N", "Equipo", "Destacado")
+# nombres tras RENAME_MAP (src/data.py)
+TOOLTIP_COLS = ("Temporada", "Liga", "posicion", "Edad", "minutos_jugados")
+
+
+def _singleton(layer: dict) -> dict:
+    # capas sin datos propios (reglas, textos fijos): una sola marca, no una por fila
+    return {"data": {"values": [{}]}, **layer}
+
+
+def scatter_vega(
+    df: pd.DataFrame,
+    x_col: str,
+    y_col: str,
+    label_col: str,
+    team_col: str,
+    jugador_destacado: Optional[str] = None,
+    equipo_resaltado: Optional[str] = None,
+    top_n: int = 5,
+    color_destacado: str = "#FB8E4B",
+    color_equipo: str = "red",
+    color_top: str = "dimgray",
+    color_resto: str = "lightgray",
+    subtitulo: Optional[str] = None,
+    ref_type: str = "Mediana",
+    filtros: Optional[dict] = None,
+    tooltip_cols: Sequence[str] = TOOLTIP_COLS,
+    height: int = 560,
+    ds: Optional[LazyDataset] = None,
+    max_labels: int = MAX_LABELS,
+) -> tuple[dict, pd.DataFrame]:
+    """
+    Mismo scatter que plot_scatter_v2 (filtros, referencias y categorías) como spec
+    Vega-Lite + payload columnar, para dibujar en el navegador con tooltips y zoom:
+    st.vega_lite_chart(data, spec). El servidor sólo arma las columnas.
+    """
+    sd = scatter_data(
+        df, x_col, y_col, label_col, team_col,
+        jugador_destacado=jugador_destacado, equipo_resaltado=equipo_resaltado,
+        top_n=top_n, ref_type=ref_type, filtros=filtros, ds=ds,
+    )
+
+    # payload mínimo: nombres de campo cortos (los de métricas traen '.', '%', '/'),
+    # floats de 32 bits y textos como categorías (Arrow los manda como diccionario)
+    data = pd.DataFrame({
+        "x": sd.xs.astype("float32"),
+        "y": sd.ys.astype("float32"),
+        "cat": sd.cat.astype("int8"),
+        "label": pd.Categorical(sd.labels),
+        "lbl": np.zeros(len(sd.cat), dtype="int8"),   # 1 = con etiqueta (mismo cupo que matplotlib)
+    })
+    data.loc[label_rows(sd, max_labels), "lbl"] = 1
+    tooltip = [
+        {"field": "label", "type": "nominal", "title": label_col},
+        {"field": "x", "type": "quantitative", "title": x_col, "format": ".2f"},
+        {"field": "y", "type": "quantitative", "title": y_col, "format": ".2f"},
+    ]
+    extra = [team_col] if team_col in sd.df.columns and team_col != label_col else []
+    extra += [c for c in tooltip_cols if c in sd.df.columns and c not in (label_col, team_col)]
+    for k, col in enumerate(extra):
+        s = sd.df[col]
+        numeric = pd.api.types.is_numeric_dtype(s)
+        data[f"t{k}"] = s.to_numpy() if numeric else pd.Categorical(s.astype(str).to_numpy())
+        tooltip.append({"field": f"t{k}", "type": "quantitative" if numeric else "nominal", "title": col})
+    # las categorías altas al final: se dibujan encima
+    data = data.iloc[np.argsort(sd.cat, kind="stable")].reset_index(drop=True)
+
+    dominio = [RESTO, TOP, EQUIPO, DESTACADO]
+    x_enc = {"field": "x", "type": "quantitative", "title": x_col, "scale": {"zero": False}}
+    y_enc = {"field": "y", "type": "quantitative", "title": y_col, "scale": {"zero": False}}
+    regla = {"type": "rule", "color": "gray", "strokeDash": [4, 4], "strokeWidth": 1}
+
+    spec = {
+        "width": "container",
+        "height": height,
+        "background": BG,
+        "title": {"text": subtitulo or f"{x_col} vs {y_col}", "color": FG},
+        "layer": [
+            # sin filas la referencia es NaN (JSON inválido): se omite la regla
+            *[
+                _singleton({"mark": regla, "encoding": {canal: {"datum": ref, "type": "quantitative"}}})
+                for canal, ref in (("x", sd.ref_x), ("y", sd.ref_y)) if np.isfinite(ref)
+            ],
+            {
+                "mark": {"type": "circle", "opacity": 0.8, "stroke": "black", "strokeWidth": 0.8},
+                "params": [{"name": "zoom", "select": "interval", "bind": "scales"}],
+                "encoding": {
+                    "x": x_enc,
+                    "y": y_enc,
+                    "color": {
+                        "field": "cat", "type": "ordinal",
+                        "scale": {"domain": dominio, "range": [color_resto, color_top, color_equipo, color_destacado]},
+                        "legend": {"title": None, "labelExpr": f"{list(CATEGORIAS)}[datum.value]"},
+                    },
+                    "size": {"field": "cat", "type": "ordinal", "scale": {"domain": dominio, "range": [30, 50, 60, 70]}, "legend": None},
+                    "strokeOpacity": {"condition": {"test": f"datum.cat > {RESTO}", "value": 1}, "value": 0},
+                    "tooltip": tooltip,
+                },
+            },
+            *[
+                {
+                    "transform": [{"filter": filtro}],
+                    "mark": {"type": "text", "align": "left", "baseline": "bottom", "dx": 14, "dy": -10,
+                             "fontSize": 11, "fontWeight": peso, "color": FG},
+                    "encoding": {"x": x_enc, "y": y_enc, "text": {"field": "label"}},
+                }
+                for filtro, peso in (
+                    (f"datum.lbl && datum.cat < {DESTACADO}", "normal"),
+                    (f"datum.lbl && datum.cat == {DESTACADO}", "bold"),
+                )
+            ],
+            _singleton({
+                "mark": {"type": "text", "align": "right", "baseline": "bottom", "dx": -4, "dy": -4, "fontSize": 11, "color": "lightgray"},
+                "encoding": {
+                    "x": {"value": "width"},
+                    "y": {"value": "height"},
+                    "text": {"value": [
+                        f"{sd.ref_label} {x_col}: {sd.ref_x:.2f}",
+                        f"{sd.ref_label} {y_col}: {sd.ref_y:.2f}",
+                    ]},
+                },
+            }),
+        ],
+        "config": {
+            "view": {"stroke": None},
+            "axis": {"labelColor": FG, "titleColor": FG, "domainColor": FG, "tickColor": FG, "gridColor": "#2b2b2b"},
+            "legend": {"labelColor": FG, "orient": "top-left"},
+        },
+    }
+    return spec, data
@@ -1,5 +1,19 @@
+import io
+import os
+from pathlib import Path
+
 import streamlit as st
 import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as pads
+import pyarrow.parquet as pq
+
+from src import store
+from src.dataset import LazyDataset
+from src.dtypes import compact_dtypes
+from src.filters import FILTER_COLS, canonical_filters, global_filters_ui
+from src.text_index import TextColumnIndex, split_terms
 
 RENAME_MAP = {
     "Minutos jugados": "minutos_jugados",
@@ -7,29 +21,200 @@ RENAME_MAP = {
     "País de nacimiento": "Nacionalidad",
 }
 
-@st.cache_data(show_spinner=False)
-def read_dataset(uploaded_file) -> pd.DataFrame:
-    name = uploaded_file.name.lower()
+# Archivo histórico: carpeta de Parquet particionada (hive) por Temporada/Liga
+ARCHIVE_DIR = os.environ.get("FOOTBALL_ARCHIVE_DIR", "")
+ARCHIVE_PARTITIONS = ["Temporada", "Liga"]
+
+def _parse(name: str, data: bytes) -> pd.DataFrame:
+    name = name.lower()
     if name.endswith(".xlsx"):
-        xls = pd.ExcelFile(uploaded_file)
+        xls = pd.ExcelFile(io.BytesIO(data))
         df = xls.parse(xls.sheet_names[0])
     elif name.endswith(".parquet"):
-        df = pd.read_parquet(uploaded_file)
+        df = pd.read_parquet(io.BytesIO(data))
     elif name.endswith(".csv"):
-        df = pd.read_csv(uploaded_file)
+        df = pd.read_csv(io.BytesIO(data))
     else:
         raise ValueError("Formato no compatible. Usá .xlsx, .parquet o .csv")
 
-    df = df.copy()
     df.rename(columns={k: v for k, v in RENAME_MAP.items() if k in df.columns}, inplace=True)
-    return df
+    df.columns = [str(c) for c in df.columns]
+    return df.reset_index(drop=True)
+
+def _ingest(digest: str, name: str, data: bytes) -> LazyDataset:
+    # fijado al abrir: un evict de otra subida no lo puede borrar antes de que el handle exista
+    path = store.open_artifact(digest, pin=True)
+    if path is not None:
+        return LazyDataset(digest, path=path, pinned=True)
+
+    # compact_dtypes también deja todo Arrow-safe (sin columnas object mezcladas)
+    df, report = compact_dtypes(_parse(name, data))
+    df.attrs["ingest"] = report
+    try:
+        path = store.save_artifact(digest, df, metadata={"ingest": report}, pin=True)
+    except (OSError, pa.ArrowException):
+        # sin disco / sin permisos / tipos raros: seguimos sin cache, todo en memoria
+        return LazyDataset(digest, frame=df)
+    return LazyDataset(digest, path=path, pinned=True)
+
+@st.cache_resource(show_spinner=False, max_entries=16)
+def _shared_dataset(digest: str, _name: str, _data: bytes) -> LazyDataset:
+    # Registro de proceso: una sola copia por contenido, compartida entre sesiones.
+    # Sólo el digest forma la clave (mismo archivo con otro nombre = mismo dataset).
+    return _ingest(digest, _name, _data)
+
+def open_dataset(uploaded_file) -> LazyDataset:
+    """Dataset compartido para el archivo subido. Sus frames son de sólo lectura."""
+    data = uploaded_file.getvalue()
+    return _shared_dataset(store.content_hash(data), uploaded_file.name, data)
+
+def read_dataset(uploaded_file) -> pd.DataFrame:
+    return open_dataset(uploaded_file).to_pandas()
+
+def write_archive(df: pd.DataFrame, root: str | Path, row_group_size: int = 10_000):
+    """
+    Escribe df como archivo particionado Temporada=/Liga=/. Ordena por minutos
+    para que las estadísticas de row group sirvan para minutos_jugados >= X.
+    """
+    if "minutos_jugados" in df.columns:
+        df = df.sort_values("minutos_jugados", kind="stable")
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    pq.write_to_dataset(
+        table, root,
+        partition_cols=[c for c in ARCHIVE_PARTITIONS if c in df.columns],
+        row_group_size=row_group_size,
+    )
+
+def _archive_field(names: list[str], col: str) -> str | None:
+    # el archivo puede tener los nombres originales de Wyscout (antes de RENAME_MAP)
+    if col in names:
+        return col
+    original = {v: k for k, v in RENAME_MAP.items()}.get(col)
+    return original if original in names else None
+
+def archive_expression(filters: dict, names: list[str]) -> pc.Expression | None:
+    """
+    Filtros globales -> expresión de pyarrow.dataset. Temporada/Liga podan
+    particiones; el resto (y minutos >= X) usa las estadísticas de cada row group.
+    El texto de posición no se empuja: se resuelve después con el índice de texto.
+    """
+    expr = None
+    for c in FILTER_COLS:
+        field = _archive_field(names, c)
+        vals = filters.get(c)
+        if field and vals:
+            e = pc.field(field).isin(pa.array([str(v) for v in vals]))
+            expr = e if expr is None else expr & e
+    field = _archive_field(names, "minutos_jugados")
+    if field and filters.get("min_minutos") is not None:
+        e = pc.field(field) >= filters["min_minutos"]
+        expr = e if expr is None else expr & e
+    return expr
+
+def archive_version(root: str) -> str:
+    """
+    Huella de los archivos de la carpeta (path, mtime, tamaño), recalculada en cada
+    llamada: particiones nuevas, borradas o reescritas cambian la clave de los caches.
+    Mismos archivos que descubre pyarrow (ignora los que empiezan con '.' o '_').
+    """
+    base = Path(root)
+    entries = []
+    for p in base.rglob("*"):
+        if any(part.startswith((".", "_")) for part in p.relative_to(base).parts):
+            continue
+        try:
+            stat = p.stat()
+        except FileNotFoundError:
+            continue
+        if p.is_file():
+            entries.append(f"{p}:{stat.st_mtime_ns}:{stat.st_size}")
+    return store.content_hash("|".join(sorted(entries)).encode())
+
+class ParquetArchive:
+    """Carpeta de Parquet particionada. Sólo se leen las filas que pasan los filtros."""
+
+    def __init__(self, root: str, version: str):
+        self.root = root
+        self.version = version
+        # particiones como diccionario de strings ("2024" no debe inferirse como int)
+        partitioning = pads.HivePartitioning.discover(infer_dictionary=True)
+        self.dataset = pads.dataset(root, format="parquet", partitioning=partitioning)
+        self.names = self.dataset.schema.names
+
+    def read(self, columns: list[str] | None = None, filters: dict | None = None) -> pd.DataFrame:
+        expr = archive_expression(filters or {}, self.names)
+        fields = None
+        if columns is not None:
+            fields = [f for f in (_archive_field(self.names, c) for c in columns) if f]
+        df = self.dataset.to_table(columns=fields, filter=expr).to_pandas()
+        df.rename(columns={k: v for k, v in RENAME_MAP.items() if k in df.columns}, inplace=True)
+        return df.reset_index(drop=True)
+
+@st.cache_resource(show_spinner=False, max_entries=4)
+def _open_archive(root: str, version: str) -> ParquetArchive:
+    # version en la clave: si cambian los archivos se vuelve a descubrir el dataset
+    return ParquetArchive(root, version)
+
+@st.cache_resource(show_spinner=False, max_entries=4)
+def _archive_catalog(root: str, version: str) -> LazyDataset:
+    # Sólo las columnas de filtro: alimenta opciones y conteos sin leer los KPIs
+    archive = _open_archive(root, version)
+    df, _ = compact_dtypes(archive.read(FILTER_COLS + ["posicion", "minutos_jugados"]))
+    return LazyDataset(f"catalog:{version}", frame=df)
+
+@st.cache_resource(show_spinner=False, max_entries=8)
+def _archive_slice(root: str, version: str, filters_key: str, _filters: dict) -> LazyDataset:
+    archive = _open_archive(root, version)
+    df = archive.read(filters=_filters)
+    if "posicion" in df.columns and _filters.get("posicion_contains"):
+        # el texto de posición no se empuja a pyarrow: se resuelve acá, sobre lo ya filtrado
+        df = df[TextColumnIndex(df["posicion"]).mask(split_terms(_filters["posicion_contains"]))].reset_index(drop=True)
+    df, report = compact_dtypes(df)
+    df.attrs["ingest"] = report
+    return LazyDataset(store.content_hash(f"{version}|{filters_key}".encode()), frame=df)
+
+def load_archive(root: str, filters: dict) -> LazyDataset:
+    """Filas del archivo que pasan los filtros, como dataset compartido (mismos flujos que un upload)."""
+    return _archive_slice(root, archive_version(root), canonical_filters(filters), dict(filters))
+
+def archive_ui():
+    root = st.text_input("Carpeta del archivo Parquet (particionado Temporada=/Liga=)", value=ARCHIVE_DIR)
+    if not root:
+        return None
+    if not Path(root).is_dir():
+        st.error("No encuentro esa carpeta.")
+        return None
+    try:
+        version = archive_version(root)
+        archive = _open_archive(root, version)
+        catalog = _archive_catalog(root, version)
+    except Exception as e:
+        st.error(f"No pude leer el archivo: {e}")
+        return None
+
+    st.caption(f"{len(archive.dataset.files)} archivos · {len(catalog.to_pandas()):,} filas en total".replace(",", "."))
+    global_filters_ui(catalog)
+    if not st.button("Cargar del archivo", type="primary"):
+        return None
+    return load_archive(root, st.session_state.get("global_filters", {}))
 
 def uploader_ui():
+    source = st.radio("Origen", ["Subir archivo", "Archivo Parquet particionado"], horizontal=True)
+    if source != "Subir archivo":
+        return archive_ui()
     uploaded = st.file_uploader("Subí dataset (.xlsx / .parquet / .csv)", type=["xlsx", "parquet", "csv"])
     if uploaded is None:
         return None
     try:
-        return read_dataset(uploaded)
+        ds = open_dataset(uploaded)
     except Exception as e:
         st.error(f"No pude leer el archivo: {e}")
         return None
+    report = ds.attrs.get("ingest")
+    if report:
+        mb = 1024 ** 2
+        st.caption(
+            f"Memoria: {report['bytes_before'] / mb:.1f} MB → {report['bytes_after'] / mb:.1f} MB "
+            f"({report['bytes_saved'] / mb:.1f} MB ahorrados, {len(report['columns'])} columnas compactadas)"
+        )
+    return ds
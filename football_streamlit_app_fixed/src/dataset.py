@@ -0,0 +1,76 @@
+import threading
+import weakref
+from pathlib import Path
+from typing import Any, Callable, Sequence
+
+import pandas as pd
+
+from src import store
+
+
+class LazyDataset:
+    """
+    Handle a un dataset ingerido. Las páginas piden columnas con select();
+    si el origen es el Parquet del store sólo se leen esas columnas
+    y quedan cacheadas para pedidos siguientes.
+
+    El handle se comparte entre sesiones (ver data.open_dataset): los frames
+    que devuelve no se modifican in-place; los subconjuntos se guardan como
+    posiciones de fila (index == posición, RangeIndex).
+    """
+
+    def __init__(self, digest: str, path: Path | None = None, frame: pd.DataFrame | None = None,
+                 pinned: bool = False):
+        if path is None and frame is None:
+            raise ValueError("LazyDataset necesita un Parquet o un DataFrame.")
+        self.digest = digest
+        self.path = path
+        self._lock = threading.Lock()
+        self._derived: dict = {}
+        self._derived_lock = threading.Lock()
+        if frame is not None:
+            self._frame = frame
+            self.columns = list(frame.columns)
+            self.n_rows = len(frame)
+            self.attrs = dict(frame.attrs)
+        else:
+            self._frame = None
+            # el Parquet se lee a demanda: que evict no lo borre mientras el handle viva.
+            # pinned: quien lo abrió ya lo fijó (store.open_artifact / save_artifact con pin=True)
+            if not pinned:
+                store.pin(path)
+            weakref.finalize(self, store.unpin, path)
+            self.columns = store.column_names(path)
+            self.n_rows = store.num_rows(path)
+            self.attrs = store.read_metadata(path)
+
+    @property
+    def loaded_columns(self) -> list[str]:
+        return [] if self._frame is None else list(self._frame.columns)
+
+    def select(self, columns: Sequence[str]) -> pd.DataFrame:
+        """DataFrame con las columnas pedidas (las que no existen se ignoran)."""
+        columns = [c for c in dict.fromkeys(columns) if c in self.columns]
+        with self._lock:
+            missing = [c for c in columns if c not in self.loaded_columns]
+            if missing:
+                new = store.read_columns(self.path, missing)
+                frame = new if self._frame is None else pd.concat([self._frame, new], axis=1)
+                # mantener el orden del schema: select(todas) devuelve el mismo frame sin copiar
+                self._frame = frame[[c for c in self.columns if c in frame.columns]]
+            frame = self._frame
+        if list(frame.columns) == columns:
+            return frame
+        return frame[columns]
+
+    def derived(self, key, build: Callable[[], Any]):
+        """Estructura derivada (índices, agregados...) construida una vez por dataset y compartida."""
+        with self._derived_lock:
+            if key not in self._derived:
+                self._derived[key] = build()
+            return self._derived[key]
+
+    def to_pandas(self) -> pd.DataFrame:
+        df = self.select(self.columns)
+        df.attrs.update(self.attrs)
+        return df
@@ -0,0 +1,77 @@
+import numpy as np
+import pandas as pd
+
+MAX_CATEGORY_RATIO = 0.5   # únicos / filas por encima de esto -> string Arrow
+FLOAT32_RTOL = 1e-6        # error relativo tolerado al pasar KPIs a float32
+
+STRING_DTYPE = "string[pyarrow]"
+_NUMERIC_TEXT = r"[-+]?[\d.,]+\s*%?"
+_DECIMAL_MARK = r"[.,%]"
+_LEADING_ZERO = r"[-+]?0\d"
+
+
+def is_kpi_column(col: str) -> bool:
+    """KPIs tipo Wyscout: '.../90' o '..., %'."""
+    return col.endswith("/90") or col.endswith("%")
+
+
+def coerce_numeric_text(s: pd.Series) -> pd.Series | None:
+    """
+    '45,3%' / '1.234,5' / '12.5' -> float. None si la columna no es numérica.
+    Texto sólo de dígitos ('2024', IDs, '007') queda como texto: sin separador
+    decimal ni '%' en ningún valor, o con ceros a la izquierda, no se convierte.
+    """
+    txt = s.dropna().astype(str).str.strip()
+    if txt.empty or not txt.str.fullmatch(_NUMERIC_TEXT).all():
+        return None
+    if not txt.str.contains(_DECIMAL_MARK).any() or txt.str.match(_LEADING_ZERO).any():
+        return None
+    txt = txt.str.rstrip("%").str.strip()
+    # con coma decimal, los puntos son separadores de miles
+    comma = txt.str.contains(",", regex=False)
+    txt = txt.where(~comma, txt.str.replace(".", "", regex=False).str.replace(",", ".", regex=False))
+    num = pd.to_numeric(txt, errors="coerce")
+    if num.isna().any():
+        return None
+    return num.astype("float64").reindex(s.index)
+
+
+def _fits_float32(s: pd.Series) -> bool:
+    arr = s.to_numpy(dtype="float64", na_value=np.nan)
+    with np.errstate(over="ignore"):
+        arr32 = arr.astype(np.float32)
+    return bool(np.allclose(arr32, arr, rtol=FLOAT32_RTOL, atol=0, equal_nan=True))
+
+
+def compact_dtypes(df: pd.DataFrame) -> tuple[pd.DataFrame, dict]:
+    """
+    Convierte in-place a tipos compactos y devuelve (df, reporte):
+      - texto numérico ('45,3%') -> float
+      - texto de baja cardinalidad -> category, el resto -> string Arrow
+      - KPIs float64 -> float32 si no se pierde precisión
+    """
+    before = int(df.memory_usage(deep=True).sum())
+    changes: dict[str, str] = {}
+    n = len(df)
+
+    for c in df.columns:
+        s = orig = df[c]
+        if s.dtype == object or pd.api.types.is_string_dtype(s.dtype):
+            num = coerce_numeric_text(s)
+            if num is not None:
+                s = num
+            else:
+                s = s.astype(STRING_DTYPE)
+                if n and s.nunique(dropna=True) / n <= MAX_CATEGORY_RATIO:
+                    s = s.astype("category")
+
+        if is_kpi_column(c) and pd.api.types.is_float_dtype(s.dtype) and s.dtype != np.float32 and _fits_float32(s):
+            s = s.astype(np.float32)
+
+        if s.dtype != orig.dtype:
+            df[c] = s
+            changes[c] = str(s.dtype)
+
+    after = int(df.memory_usage(deep=True).sum())
+    report = {"bytes_before": before, "bytes_after": after, "bytes_saved": before - after, "columns": changes}
+    return df, report
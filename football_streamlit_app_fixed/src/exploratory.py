@@ -1,24 +1,118 @@
+import warnings
+from dataclasses import dataclass
+
 import streamlit as st
 import pandas as pd
 import numpy as np
 
-def overview(df: pd.DataFrame):
+from src.dataset import LazyDataset
+from src.partition_stats import PartitionStats, partition_stats
+from src.sketches import sketch_quantiles
+from src.state import selection_key
+
+DESCRIBE_QUANTILES = (0.25, 0.50, 0.75)
+
+
+@dataclass
+class DatasetProfile:
+    n_rows: int
+    n_cols: int
+    nulls: pd.Series          # nulos por columna
+    duplicates: int
+    describe: pd.DataFrame    # mismo layout que df.describe().T (sólo numéricas)
+
+
+def _describe_numeric(num: pd.DataFrame, quantiles: pd.DataFrame | None = None) -> pd.DataFrame:
+    # Una sola matriz float64 y reducciones por eje, en vez de describe() columna a columna
+    arr = num.to_numpy(dtype="float64", na_value=np.nan)
+    with warnings.catch_warnings():
+        # columnas todo-NaN: numpy avisa y devuelve NaN, igual que describe()
+        warnings.simplefilter("ignore", RuntimeWarning)
+        stats = {
+            "count": np.sum(~np.isnan(arr), axis=0).astype(float),
+            "mean": np.nanmean(arr, axis=0),
+            "std": np.nanstd(arr, axis=0, ddof=1),
+            "min": np.nanmin(arr, axis=0),
+        }
+        # quantiles: de los sketches si vienen (evita ordenar toda la matriz), si no exactos
+        qs = quantiles[num.columns].to_numpy() if quantiles is not None else np.nanquantile(arr, DESCRIBE_QUANTILES, axis=0)
+        for q, row in zip(DESCRIBE_QUANTILES, qs):
+            stats[f"{int(q * 100)}%"] = row
+        stats["max"] = np.nanmax(arr, axis=0)
+    return pd.DataFrame(stats, index=num.columns)
+
+
+def profile_frame(df: pd.DataFrame, quantiles: pd.DataFrame | None = None) -> DatasetProfile:
+    """Nulos, duplicados (por hash de fila) y describe numérico en una pasada."""
+    # hash vectorizado por fila: mucho más barato que df.duplicated() sobre 150 columnas
+    row_hash = pd.util.hash_pandas_object(df, index=False)
+    return DatasetProfile(
+        n_rows=df.shape[0],
+        n_cols=df.shape[1],
+        nulls=df.isna().sum(),
+        duplicates=int(row_hash.duplicated().sum()),
+        describe=_describe_numeric(df.select_dtypes(include=[np.number]), quantiles),
+    )
+
+
+def _exact_quantiles(num: pd.DataFrame) -> pd.DataFrame:
+    arr = num.to_numpy(dtype="float64", na_value=np.nan)
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)
+        return pd.DataFrame(np.nanquantile(arr, DESCRIBE_QUANTILES, axis=0), index=list(DESCRIBE_QUANTILES), columns=num.columns)
+
+
+def profile_partitions(stats: PartitionStats, parts: np.ndarray, quantiles: pd.DataFrame) -> DatasetProfile:
+    """Perfil de una unión de particiones completas, combinando sus agregados (sin recorrer filas)."""
+    agg = stats.combine(parts)
+    desc = agg["numeric"]
+    for q, row in zip(DESCRIBE_QUANTILES, quantiles[desc.index].to_numpy()):
+        desc.insert(len(desc.columns) - 1, f"{int(q * 100)}%", row)
+    return DatasetProfile(
+        n_rows=agg["n_rows"],
+        n_cols=len(stats.columns),
+        nulls=agg["nulls"],
+        duplicates=agg["duplicates"],
+        describe=desc,
+    )
+
+
+@st.cache_data(show_spinner=False, max_entries=64)
+def _cached_profile(digest: str, selection: str, _ds: LazyDataset, _df: pd.DataFrame, _rows) -> DatasetProfile:
+    num_cols = list(_df.select_dtypes(include=[np.number]).columns)
+    quantiles = sketch_quantiles(_ds, _rows, num_cols, DESCRIBE_QUANTILES)
+    # selección = particiones Temporada x Liga x tramo de minutos completas: combinar agregados, sin recorrer filas
+    stats = partition_stats(_ds)
+    parts = stats.partitions.covering_partitions(_rows)
+    if parts is not None and stats.numeric_columns == num_cols:
+        if quantiles is None:
+            quantiles = _exact_quantiles(_df[num_cols])
+        return profile_partitions(stats, parts, quantiles)
+    return profile_frame(_df, quantiles)
+
+
+def dataset_profile(ds: LazyDataset, df: pd.DataFrame, rows: np.ndarray | None) -> DatasetProfile:
+    """Perfil de df (= ds filtrado por rows), cacheado por hash del dataset + selección de filas."""
+    return _cached_profile(ds.digest, selection_key(rows), ds, df, rows)
+
+
+def overview(prof: DatasetProfile):
     c1, c2, c3, c4 = st.columns(4)
-    c1.metric("Filas", f"{df.shape[0]:,}".replace(",", "."))
-    c2.metric("Columnas", f"{df.shape[1]:,}".replace(",", "."))
-    c3.metric("Nulos", f"{int(df.isna().sum().sum()):,}".replace(",", "."))
-    c4.metric("Duplicados", f"{int(df.duplicated().sum()):,}".replace(",", "."))
+    c1.metric("Filas", f"{prof.n_rows:,}".replace(",", "."))
+    c2.metric("Columnas", f"{prof.n_cols:,}".replace(",", "."))
+    c3.metric("Nulos", f"{int(prof.nulls.sum()):,}".replace(",", "."))
+    c4.metric("Duplicados", f"{prof.duplicates:,}".replace(",", "."))
 
-def missing_table(df: pd.DataFrame, top_n: int = 30):
-    miss = df.isna().mean().sort_values(ascending=False)
+def missing_table(prof: DatasetProfile, top_n: int = 30):
+    miss = (prof.nulls / prof.n_rows) if prof.n_rows else prof.nulls.astype(float)
+    miss = miss.sort_values(ascending=False)
     miss = (miss * 100).round(2)
     out = miss.head(top_n).reset_index()
     out.columns = ["columna", "%_nulos"]
     st.dataframe(out, use_container_width=True)
 
-def numeric_describe(df: pd.DataFrame):
-    num = df.select_dtypes(include=[np.number])
-    if num.empty:
+def numeric_describe(prof: DatasetProfile):
+    if prof.describe.empty:
         st.info("No hay columnas numéricas para describir.")
         return
-    st.dataframe(num.describe().T, use_container_width=True)
+    st.dataframe(prof.describe, use_container_width=True)
@@ -1,60 +1,284 @@
+import json
+import threading
+from collections import OrderedDict
+
+import numpy as np
 import streamlit as st
 import pandas as pd
 
-def _sorted_unique(series):
-    return sorted([x for x in series.dropna().unique().tolist()])
+from src.dataset import LazyDataset
+from src.sketches import MINUTES_STEP, minutes_base
+from src.text_index import split_terms, text_index
+
+FILTER_COLS = ["Temporada", "País", "Liga", "Equipo", "Pie"]
+
+
+class FilterIndex:
+    """
+    Índice de filtros globales, construido una vez por dataset:
+      - options[col]: valores ordenados (lo que muestran los multiselect)
+      - codes[col]: código por fila (posición en options, -1 = nulo)
+      - bitmaps[col]: un bitmap empaquetado (np.packbits) por valor
+    Los filtros se combinan con OR dentro de cada columna y AND entre columnas.
+    """
+
+    def __init__(self, df: pd.DataFrame):
+        self.n_rows = len(df)
+        self.options: dict[str, list] = {}
+        self.codes: dict[str, np.ndarray] = {}
+        self.bitmaps: dict[str, np.ndarray] = {}
+        self.totals: dict[str, np.ndarray] = {}
+        self._lookup: dict[str, dict] = {}
+
+        for c in FILTER_COLS:
+            if c not in df.columns:
+                continue
+            codes, uniques = pd.factorize(df[c], sort=True)
+            codes = codes.astype(np.int32)
+            bitmaps = np.zeros((len(uniques), (self.n_rows + 7) // 8), dtype=np.uint8)
+            # agrupamos filas por código con un solo argsort en vez de un == por valor
+            order = np.argsort(codes, kind="stable")
+            bounds = np.searchsorted(codes[order], np.arange(len(uniques) + 1))
+            bits = np.zeros(self.n_rows, dtype=bool)
+            for k in range(len(uniques)):
+                rows = order[bounds[k]:bounds[k + 1]]
+                bits[rows] = True
+                bitmaps[k] = np.packbits(bits)
+                bits[rows] = False
+
+            self.options[c] = uniques.tolist()
+            self.codes[c] = codes
+            self.bitmaps[c] = bitmaps
+            self.totals[c] = np.diff(bounds)
+            self._lookup[c] = {v: k for k, v in enumerate(self.options[c])}
+
+    def column_bits(self, col: str, values) -> np.ndarray | None:
+        """OR de los bitmaps de los valores elegidos (None si la columna no filtra)."""
+        if not values or col not in self.bitmaps:
+            return None
+        ks = [self._lookup[col][v] for v in values if v in self._lookup[col]]
+        if not ks:
+            return np.zeros(self.bitmaps[col].shape[1], dtype=np.uint8)
+        return np.bitwise_or.reduce(self.bitmaps[col][ks], axis=0)
+
+    def code_of(self, col: str, value) -> int:
+        return self._lookup[col].get(value, -1)
+
+    def facet_counts(self, filters: dict, extra_mask: np.ndarray | None = None) -> dict[str, np.ndarray]:
+        """
+        Filas por valor de cada columna, condicionadas al resto de filtros activos
+        (el filtro de la propia columna no cuenta, así se ven las alternativas).
+        """
+        bits = {c: self.column_bits(c, filters.get(c)) for c in self.codes}
+        extra = np.packbits(extra_mask) if extra_mask is not None else None
+        counts = {}
+        for c, codes in self.codes.items():
+            acc = extra
+            for other, b in bits.items():
+                if other != c and b is not None:
+                    acc = b if acc is None else acc & b
+            if acc is None:
+                counts[c] = self.totals[c]
+                continue
+            m = np.unpackbits(acc, count=self.n_rows).astype(bool)
+            sel = codes[m]
+            counts[c] = np.bincount(sel[sel >= 0], minlength=len(self.options[c]))
+        return counts
+
+    def mask(self, filters: dict) -> np.ndarray | None:
+        """AND de las columnas filtradas como máscara booleana por fila (None = sin filtros)."""
+        acc = None
+        for c in FILTER_COLS:
+            bits = self.column_bits(c, filters.get(c))
+            if bits is not None:
+                acc = bits if acc is None else acc & bits
+        if acc is None:
+            return None
+        return np.unpackbits(acc, count=self.n_rows).astype(bool)
+
+
+class RowSetCache:
+    """LRU de selecciones de filas (arrays de posiciones), acotado por entradas y por bytes."""
+
+    def __init__(self, max_entries: int = 256, max_bytes: int = 64 * 1024 ** 2):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._data: OrderedDict = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, key) -> np.ndarray | None:
+        with self._lock:
+            rows = self._data.get(key)
+            if rows is None:
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return rows
+
+    def put(self, key, rows: np.ndarray) -> np.ndarray:
+        # int32 alcanza para posiciones de fila y es read-only: se comparte entre sesiones
+        rows = np.asarray(rows, dtype=np.int32)
+        rows.flags.writeable = False
+        with self._lock:
+            old = self._data.pop(key, None)
+            if old is not None:
+                self._bytes -= old.nbytes
+            if rows.nbytes > self.max_bytes:
+                return rows
+            self._data[key] = rows
+            self._bytes += rows.nbytes
+            while len(self._data) > self.max_entries or self._bytes > self.max_bytes:
+                _, dropped = self._data.popitem(last=False)
+                self._bytes -= dropped.nbytes
+                self.evictions += 1
+        return rows
+
+    def stats(self) -> dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "entries": len(self._data),
+                "bytes": self._bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / total if total else 0.0,
+            }
 
-def global_filters_ui(df: pd.DataFrame):
+
+@st.cache_resource(show_spinner=False)
+def filter_result_cache() -> RowSetCache:
+    """Cache de proceso (todas las sesiones) de resultados de filtros globales."""
+    return RowSetCache()
+
+
+def canonical_filters(filters: dict) -> str:
+    """Serialización independiente del orden; los filtros vacíos no cuentan."""
+    out = {}
+    for k, v in filters.items():
+        if v is None or v == "" or (isinstance(v, (list, tuple, set)) and not v):
+            continue
+        if isinstance(v, (list, tuple, set)):
+            v = sorted((str(x) for x in v))
+        out[k] = v
+    return json.dumps(out, sort_keys=True, ensure_ascii=False, default=str)
+
+
+def filter_index(ds: LazyDataset) -> FilterIndex:
+    return ds.derived("filter_index", lambda: FilterIndex(ds.select(FILTER_COLS)))
+
+
+def _minutes_range(ds: LazyDataset) -> tuple[int, int]:
+    def build():
+        s = ds.select(["minutos_jugados"])["minutos_jugados"]
+        if not s.notna().any():
+            return 0, 0
+        # mismo mínimo que los tramos de minutos de las particiones (sketches.minutes_bucket)
+        return minutes_base(s), int(s.max())
+    return ds.derived("minutes_range", build)
+
+
+def _facet_multiselect(label: str, col: str, idx: FilterIndex, counts: dict, filters: dict):
+    key = f"gf_{col}"
+    selected = st.session_state.get(key, filters.get(col, []))
+    n = counts[col]
+    # sólo valores con filas dado el resto de filtros (+ lo ya elegido, para no perderlo)
+    options = [v for v in idx.options[col] if n[idx.code_of(col, v)] > 0 or v in selected]
+    return st.multiselect(
+        label,
+        options,
+        default=[v for v in filters.get(col, []) if v in options],
+        format_func=lambda v: f"{v} ({n[idx.code_of(col, v)]:,})".replace(",", "."),
+        key=key,
+    )
+
+
+def global_filters_ui(ds: LazyDataset):
     # Estos nombres siguen tu script; ajustamos si tu DB usa otros.
     filters = st.session_state.get("global_filters", {})
+    idx = filter_index(ds)
+
+    # Los conteos usan el valor actual de cada widget (session_state), no el del último "Aplicar"
+    current = dict(filters)
+    for k in list(FILTER_COLS) + ["posicion_contains", "min_minutos"]:
+        if f"gf_{k}" in st.session_state:
+            current[k] = st.session_state[f"gf_{k}"]
+    counts = idx.facet_counts(current, _extra_mask(ds, current))
 
     cols = st.columns(4)
     with cols[0]:
-        if "Temporada" in df.columns:
-            filters["Temporada"] = st.multiselect("Temporada", _sorted_unique(df["Temporada"]), default=filters.get("Temporada", []))
+        if "Temporada" in idx.options:
+            filters["Temporada"] = _facet_multiselect("Temporada", "Temporada", idx, counts, filters)
     with cols[1]:
-        if "País" in df.columns:
-            filters["País"] = st.multiselect("País", _sorted_unique(df["País"]), default=filters.get("País", []))
+        if "País" in idx.options:
+            filters["País"] = _facet_multiselect("País", "País", idx, counts, filters)
     with cols[2]:
-        if "Liga" in df.columns:
-            filters["Liga"] = st.multiselect("Liga", _sorted_unique(df["Liga"]), default=filters.get("Liga", []))
+        if "Liga" in idx.options:
+            filters["Liga"] = _facet_multiselect("Liga", "Liga", idx, counts, filters)
     with cols[3]:
-        if "Equipo" in df.columns:
-            filters["Equipo"] = st.multiselect("Equipo", _sorted_unique(df["Equipo"]), default=filters.get("Equipo", []))
+        if "Equipo" in idx.options:
+            filters["Equipo"] = _facet_multiselect("Equipo", "Equipo", idx, counts, filters)
 
     cols2 = st.columns(3)
     with cols2[0]:
-        if "Pie" in df.columns:
-            filters["Pie"] = st.multiselect("Pie", _sorted_unique(df["Pie"]), default=filters.get("Pie", []))
+        if "Pie" in idx.options:
+            filters["Pie"] = _facet_multiselect("Pie", "Pie", idx, counts, filters)
     with cols2[1]:
-        if "posicion" in df.columns:
-            filters["posicion_contains"] = st.text_input("Posición contiene (texto)", value=filters.get("posicion_contains", ""))
+        if "posicion" in ds.columns:
+            filters["posicion_contains"] = st.text_input(
+                "Posición contiene (texto)", value=filters.get("posicion_contains", ""), key="gf_posicion_contains"
+            )
     with cols2[2]:
-        if "minutos_jugados" in df.columns:
-            mn = int(df["minutos_jugados"].min()) if df["minutos_jugados"].notna().any() else 0
-            mx = int(df["minutos_jugados"].max()) if df["minutos_jugados"].notna().any() else 0
+        if "minutos_jugados" in ds.columns:
+            mn, mx = _minutes_range(ds)
             default = filters.get("min_minutos", min(300, mx))
-            filters["min_minutos"] = st.slider("Minutos mínimos", mn, mx, int(default), step=50)
+            filters["min_minutos"] = st.slider("Minutos mínimos", mn, mx, int(default), step=MINUTES_STEP, key="gf_min_minutos")
 
     st.session_state.global_filters = filters
 
-def apply_global_filters(df: pd.DataFrame) -> pd.DataFrame:
+
+def apply_global_filters(ds: LazyDataset) -> np.ndarray:
+    """Posiciones de fila que pasan los filtros globales (sin copiar el df)."""
     f = st.session_state.get("global_filters", {})
-    out = df.copy()
+    cache = filter_result_cache()
+    key = (ds.digest, canonical_filters(f))
+    rows = cache.get(key)
+    if rows is not None:
+        return rows
+    return cache.put(key, _filter_rows(ds, f))
+
+
+def _extra_mask(ds: LazyDataset, f: dict) -> np.ndarray | None:
+    """Filtros que no son de valores exactos: posición (texto) y minutos mínimos."""
+    mask = None
+
+    def _and(m):
+        nonlocal mask
+        mask = m if mask is None else mask & m
+
+    if "posicion" in ds.columns and f.get("posicion_contains"):
+        # sin acentos / mayúsculas; "CB|LCB" o "CB, LCB" = cualquiera de los dos
+        _and(text_index(ds, "posicion").mask(split_terms(f["posicion_contains"])))
 
-    def _isin(col):
-        nonlocal out
-        vals = f.get(col, [])
-        if vals and col in out.columns:
-            out = out[out[col].isin(vals)]
+    if "minutos_jugados" in ds.columns and f.get("min_minutos") is not None:
+        minutos = ds.select(["minutos_jugados"])["minutos_jugados"].to_numpy(dtype=float, na_value=np.nan)
+        _and(minutos >= f["min_minutos"])
 
-    for c in ["Temporada", "País", "Liga", "Equipo", "Pie"]:
-        _isin(c)
+    return mask
 
-    if "posicion" in out.columns and f.get("posicion_contains"):
-        out = out[out["posicion"].astype(str).str.contains(f["posicion_contains"], case=False, na=False)]
 
-    if "minutos_jugados" in out.columns and f.get("min_minutos") is not None:
-        out = out[out["minutos_jugados"] >= f["min_minutos"]]
+def _filter_rows(ds: LazyDataset, f: dict) -> np.ndarray:
+    idx = filter_index(ds)
+    mask = idx.mask(f)
+    extra = _extra_mask(ds, f)
+    if extra is not None:
+        mask = extra if mask is None else mask & extra
 
-    return out
+    if mask is None:
+        return np.arange(idx.n_rows)
+    return np.flatnonzero(mask)
@@ -0,0 +1,68 @@
+import warnings
+from typing import Sequence
+
+import numpy as np
+import pandas as pd
+
+from src.dataset import LazyDataset
+from src.sketches import PartitionedIndex
+
+# + tramo de minutos (PartitionedIndex). Equipo no entra: con tramos de 50 minutos las
+# particiones quedarían de ~1 fila y las matrices pesarían más que el dataset.
+STATS_PARTITION_COLS = ["Temporada", "Liga"]
+
+
+class PartitionStats:
+    """
+    Estadísticos suficientes por partición (Temporada x Liga x tramo de minutos), calculados
+    una vez por dataset: filas, duplicados y nulos por columna; count / media / M2
+    (suma de desvíos², estable) / min / max por columna numérica. Cualquier unión
+    de particiones se resuelve combinando filas de estas matrices (Chan et al.).
+    """
+
+    def __init__(self, df: pd.DataFrame, cols: Sequence[str] = STATS_PARTITION_COLS):
+        self.partitions = PartitionedIndex(df, cols)
+        codes = self.partitions.codes
+        n_parts = self.partitions.n_parts
+
+        self.columns = list(df.columns)
+        self.nulls = df.isna().groupby(codes).sum().reindex(range(n_parts), fill_value=0).to_numpy()
+        # filas duplicadas comparten Temporada/Liga/minutos: el conteo por partición es aditivo
+        dup = pd.util.hash_pandas_object(df, index=False).duplicated().to_numpy()
+        self.duplicates = np.bincount(codes[dup], minlength=n_parts)
+
+        num = df.select_dtypes(include=[np.number]).astype("float64")
+        self.numeric_columns = list(num.columns)
+        g = num.groupby(codes)
+        self.count = g.count().reindex(range(n_parts), fill_value=0).to_numpy(dtype=float)
+        # media y M2 por partición (no sum / sum²: restarlos cancela en columnas de magnitud grande)
+        self.mean = g.mean().reindex(range(n_parts), fill_value=0).fillna(0).to_numpy()
+        self.m2 = (g.var(ddof=0) * g.count()).reindex(range(n_parts), fill_value=0).fillna(0).to_numpy()
+        self.min = g.min().reindex(range(n_parts)).to_numpy()
+        self.max = g.max().reindex(range(n_parts)).to_numpy()
+
+    def combine(self, parts: np.ndarray) -> dict:
+        """Agregados de la unión de particiones: O(#particiones), sin tocar filas."""
+        counts, means = self.count[parts], self.mean[parts]
+        n = counts.sum(axis=0)
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", RuntimeWarning)
+            # combinación paralela de Chan para k grupos: M2 = Σ M2_i + Σ n_i (media_i - media)²
+            mean = (counts * means).sum(axis=0) / n
+            m2 = self.m2[parts].sum(axis=0) + (counts * (means - mean) ** 2).sum(axis=0)
+            std = np.where(n > 1, np.sqrt(np.maximum(m2, 0) / (n - 1)), np.nan)
+            vmin = np.nanmin(self.min[parts], axis=0) if len(parts) else np.full(len(n), np.nan)
+            vmax = np.nanmax(self.max[parts], axis=0) if len(parts) else np.full(len(n), np.nan)
+        return {
+            "n_rows": int(self.partitions.sizes[parts].sum()),
+            "nulls": pd.Series(self.nulls[parts].sum(axis=0), index=self.columns),
+            "duplicates": int(self.duplicates[parts].sum()),
+            "numeric": pd.DataFrame(
+                {"count": n, "mean": mean, "std": std, "min": vmin, "max": vmax},
+                index=self.numeric_columns,
+            ),
+        }
+
+
+def partition_stats(ds: LazyDataset) -> PartitionStats:
+    return ds.derived("partition_stats", lambda: PartitionStats(ds.to_pandas()))
@@ -1,32 +1,127 @@
+from dataclasses import dataclass
+
 import pandas as pd
 import numpy as np
+import streamlit as st
 from sklearn.preprocessing import StandardScaler
 from sklearn.decomposition import PCA
-from sklearn.metrics.pairwise import euclidean_distances
+from sklearn.neighbors import KDTree
 
-def run_pca_similarity(df_pos: pd.DataFrame, kpis: list[str], jugador: str, temporada: str) -> tuple[pd.DataFrame, pd.DataFrame]:
-    """
-    Devuelve:
-      - df_modelado: df_pos + PCA1, PCA2, distancia
-      - df_similares: df_modelado sin el jugador objetivo, ordenado por distancia asc
-    """
-    df_pos = df_pos.copy()
-    df_pos = df_pos.dropna(subset=kpis)
+from src.state import row_positions, selection_key
+
+INDEX_CACHE_SIZE = 8
+BRUTE_MAX_ROWS = 2_000   # por debajo, argpartition sobre todas las distancias es más barato que el árbol
+
+
+@dataclass
+class PcaEmbedding:
+    """Scaler + PCA ajustados sobre una base filtrada y sus coordenadas (no dependen del jugador)."""
+    rows: np.ndarray        # posiciones de fila del dataset (sin nulos en los KPIs)
+    scaler: StandardScaler
+    pca: PCA
+    coords: np.ndarray      # filas x 2, alineado con rows
 
+
+def fit_pca(df_pos: pd.DataFrame, kpis: list[str]) -> PcaEmbedding:
+    df_pos = df_pos.dropna(subset=kpis)
     scaler = StandardScaler()
     X_scaled = scaler.fit_transform(df_pos[kpis])
-
     pca = PCA(n_components=2)
-    X_pca = pca.fit_transform(X_scaled)
-    df_pos["PCA1"] = X_pca[:, 0]
-    df_pos["PCA2"] = X_pca[:, 1]
+    coords = pca.fit_transform(X_scaled)
+    rows = row_positions(df_pos)
+    # compartido entre sesiones: sólo lectura
+    rows.flags.writeable = False
+    coords.flags.writeable = False
+    return PcaEmbedding(rows, scaler, pca, coords)
+
+
+class SimilarityIndex:
+    """
+    Vecinos más cercanos sobre el embedding PCA de una base filtrada. query() devuelve
+    sólo el top-k (posiciones de fila + distancia), sin copiar ni ordenar la base:
+    KD-tree si la base es grande, si no (o con máscara) argpartition sobre las distancias.
+    """
 
-    ref = df_pos[(df_pos["Jugador"] == jugador) & (df_pos["Temporada"] == temporada)]
-    if ref.empty:
-        raise ValueError("No encontré el jugador+temporada en la base filtrada. Probá con otra temporada o relajá filtros.")
+    def __init__(self, df_pos: pd.DataFrame, kpis: list[str]):
+        self.embedding = fit_pca(df_pos, kpis)
+        self.rows = self.embedding.rows
+        self.coords = self.embedding.coords
+        info = df_pos.loc[self.rows]
+        # jugador como código entero: excluir sus filas es una comparación de ints
+        self.player_codes, players = pd.factorize(info["Jugador"])
+        self.player_lookup = {p: c for c, p in enumerate(players)}
+        self.seasons = info["Temporada"].to_numpy()
+        self.tree = KDTree(self.coords) if len(self.rows) > BRUTE_MAX_ROWS else None
 
-    dist = euclidean_distances(ref[["PCA1","PCA2"]], df_pos[["PCA1","PCA2"]])[0]
-    df_pos["distancia"] = dist
+    def ref_row(self, jugador: str, temporada: str) -> int:
+        code = self.player_lookup.get(jugador, -2)
+        hits = np.flatnonzero((self.player_codes == code) & (self.seasons == temporada))
+        if len(hits) == 0:
+            raise ValueError("No encontré el jugador+temporada en la base filtrada. Probá con otra temporada o relajá filtros.")
+        return int(hits[0])
 
-    df_similares = df_pos[df_pos["Jugador"] != jugador].sort_values("distancia", ascending=True)
-    return df_pos, df_similares
+    def query(
+        self, jugador: str, temporada: str, k: int | None = None, within: np.ndarray | None = None,
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Top-k filas más cercanas al jugador+temporada, excluyendo todas las filas del
+        jugador; ordenadas por distancia asc. k=None: todas. within: máscara booleana
+        alineada con self.rows (filtros adicionales).
+        """
+        ref = self.coords[self.ref_row(jugador, temporada)]
+        propio = self.player_codes == self.player_lookup.get(jugador, -2)
+        n = len(self.rows)
+        k = n if k is None else min(k, n)
+
+        if self.tree is not None and within is None and k < n:
+            # el árbol devuelve ordenado; se piden de más para descartar las filas del propio jugador
+            dist, idx = self.tree.query(ref[None, :], k=min(k + int(propio.sum()), n))
+            dist, idx = dist[0], idx[0]
+            keep = ~propio[idx]
+            idx, dist = idx[keep][:k], dist[keep][:k]
+        else:
+            cand = ~propio if within is None else (~propio & within)
+            idx = np.flatnonzero(cand)
+            dist = np.sqrt(((self.coords[idx] - ref) ** 2).sum(axis=1))
+            if k < len(idx):
+                top = np.argpartition(dist, k - 1)[:k]
+                idx, dist = idx[top], dist[top]
+            order = np.argsort(dist, kind="stable")
+            idx, dist = idx[order], dist[order]
+        return self.rows[idx], dist
+
+
+@st.cache_resource(show_spinner=False, max_entries=INDEX_CACHE_SIZE)
+def _shared_index(digest: str, rows_key: str, kpis: tuple, _df_pos: pd.DataFrame) -> SimilarityIndex:
+    # Registro de proceso: la clave es (dataset, selección de filas, KPIs); df_pos no se hashea
+    return SimilarityIndex(_df_pos, list(kpis))
+
+
+def similarity_index(df_pos: pd.DataFrame, kpis: list[str], digest: str | None = None) -> SimilarityIndex:
+    """
+    Índice cacheado por (dataset, selección de filas de df_pos, KPIs): cambiar el
+    jugador de referencia no vuelve a ajustar nada. Sin digest no se cachea.
+    """
+    if digest is None:
+        return SimilarityIndex(df_pos, kpis)
+    return _shared_index(digest, selection_key(row_positions(df_pos)), tuple(kpis), df_pos)
+
+
+def pca_embedding(df_pos: pd.DataFrame, kpis: list[str], digest: str | None = None) -> PcaEmbedding:
+    return similarity_index(df_pos, kpis, digest).embedding
+
+
+def run_pca_similarity(
+    df_pos: pd.DataFrame, kpis: list[str], jugador: str, temporada: str, digest: str | None = None, k: int | None = None,
+) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Devuelve:
+      - df_modelado: df_pos + PCA1, PCA2
+      - df_similares: top-k (k=None: todos) sin el jugador objetivo, ordenado por distancia asc
+    digest: hash del dataset de df_pos (index = posiciones); habilita el cache del índice.
+    """
+    index = similarity_index(df_pos, kpis, digest)
+    rows, dist = index.query(jugador, temporada, k)
+    df_modelado = df_pos.loc[index.rows].assign(PCA1=index.coords[:, 0], PCA2=index.coords[:, 1])
+    df_similares = df_pos.loc[rows].assign(distancia=dist)
+    return df_modelado, df_similares
@@ -0,0 +1,96 @@
+import re
+from typing import Sequence
+
+import numpy as np
+import pandas as pd
+
+from src.dataset import LazyDataset
+from src.sketches import partition_codes
+from src.text_index import normalize_text
+
+POSITION_COLS = ("posicion", "Posición específica")   # renombrada al cargar / original
+CUBE_PARTITION_COLS = ["Temporada", "Liga", "grupo_posicion"]
+MISSING = np.uint8(255)          # percentil sin dato (métrica nula o fila sin grupo)
+
+# posición principal (primer código) -> grupo
+POSITION_GROUPS = {
+    "Arquero": ("gk",),
+    "Central": ("cb", "lcb", "rcb"),
+    "Lateral": ("lb", "rb", "lwb", "rwb"),
+    "Mediocentro": ("dmf", "ldmf", "rdmf", "cmf", "lcmf", "rcmf"),
+    "Mediapunta": ("amf", "lamf", "ramf"),
+    "Extremo": ("lw", "rw", "lwf", "rwf"),
+    "Delantero": ("cf", "ss"),
+}
+OTHER_GROUP = "Otro"
+_GROUP_OF = {code: g for g, codes in POSITION_GROUPS.items() for code in codes}
+_FIRST_TOKEN = re.compile(r"[\s,;/|()\-]+")
+
+
+def position_group(value) -> str:
+    """Grupo de la posición principal: 'LCB, CB' -> 'Central', 'LCMF3' -> 'Mediocentro'."""
+    if value is None or (isinstance(value, float) and np.isnan(value)):
+        return OTHER_GROUP
+    tokens = [t for t in _FIRST_TOKEN.split(normalize_text(value)) if t]
+    if not tokens:
+        return OTHER_GROUP
+    return _GROUP_OF.get(re.sub(r"\d", "", tokens[0]), OTHER_GROUP)
+
+
+def position_groups(s: pd.Series) -> pd.Series:
+    # sobre valores únicos; las filas sólo se resuelven por código
+    codes, uniques = pd.factorize(s)
+    groups = np.array([position_group(v) for v in uniques] + [OTHER_GROUP], dtype=object)
+    return pd.Series(groups[codes], index=s.index, name="grupo_posicion")
+
+
+class PercentileCube:
+    """
+    Percentil (0-100) de cada fila en cada KPI numérico dentro de su grupo
+    Temporada x Liga x grupo de posición, precalculado una vez por dataset.
+    Matriz uint8 filas x KPIs (255 = sin dato): cualquier lookup es un take.
+    Percentil = % del grupo con valor <= al de la fila.
+    """
+
+    def __init__(self, df: pd.DataFrame, kpis: Sequence[str] | None = None):
+        if kpis is None:
+            kpis = [c for c in df.select_dtypes(include=[np.number]).columns]
+        self.kpis = list(kpis)
+        self.col = {k: j for j, k in enumerate(self.kpis)}
+
+        col = next((c for c in POSITION_COLS if c in df.columns), None)
+        pos = df[col] if col else pd.Series(None, index=df.index, dtype=object)
+        self.groups = position_groups(pos).to_numpy()
+        keys = df[[c for c in CUBE_PARTITION_COLS if c in df.columns]].copy()
+        keys["grupo_posicion"] = self.groups
+        self.codes = partition_codes(keys, CUBE_PARTITION_COLS)
+
+        # rank por grupo de todas las columnas en una pasada (groupby.rank, NaN quedan NaN)
+        num = df[self.kpis].astype("float64")
+        pct = num.groupby(self.codes).rank(method="max", pct=True).to_numpy()
+        with np.errstate(invalid="ignore"):
+            self.matrix = np.where(np.isnan(pct), MISSING, np.rint(pct * 100)).astype(np.uint8)
+        self.group_sizes = np.bincount(self.codes)
+
+    def percentiles(self, rows: np.ndarray | None, kpis: Sequence[str]) -> np.ndarray:
+        """Percentiles float (NaN sin dato) de rows (None = todas) x kpis."""
+        idx = [self.col[k] for k in kpis]
+        m = self.matrix[:, idx] if rows is None else self.matrix[np.asarray(rows)[:, None], idx]
+        return np.where(m == MISSING, np.nan, m.astype(np.float32))
+
+    def frame(self, df: pd.DataFrame, kpis: Sequence[str]) -> pd.DataFrame:
+        """Percentiles de las filas de df (index = posiciones del dataset), alineados con df."""
+        kpis = [k for k in kpis if k in self.col]
+        return pd.DataFrame(self.percentiles(df.index.to_numpy(dtype=np.int64), kpis), index=df.index, columns=kpis)
+
+    def table(self, df: pd.DataFrame, kpis: Sequence[str], info_cols: Sequence[str] = ()) -> pd.DataFrame:
+        """Vista de percentiles: columnas informativas + grupo, tamaño del grupo y un percentil por KPI."""
+        rows = df.index.to_numpy(dtype=np.int64)
+        out = df[[c for c in info_cols if c in df.columns]].copy()
+        out["Grupo posición"] = self.groups[rows]
+        out["n grupo"] = self.group_sizes[self.codes[rows]]
+        return pd.concat([out, self.frame(df, kpis)], axis=1)
+
+
+def percentile_cube(ds: LazyDataset) -> PercentileCube:
+    return ds.derived("percentile_cube", lambda: PercentileCube(ds.to_pandas()))
@@ -0,0 +1,110 @@
+import re
+from typing import Sequence
+
+import numpy as np
+import pandas as pd
+
+from src.dataset import LazyDataset
+from src.text_index import normalize_text
+
+SEASON_COL = "Temporada"
+_YEAR = re.compile(r"\d{4}")
+
+
+def season_rank(values: Sequence) -> np.ndarray:
+    """Orden cronológico de temporadas ('2022/23', '2023', 'Apertura 2024'): primer año y después texto."""
+    def key(k):
+        m = _YEAR.search(str(values[k]))
+        return (int(m.group()) if m else -1, str(values[k]))
+
+    rank = np.empty(len(values), dtype=np.int32)
+    rank[sorted(range(len(values)), key=key)] = np.arange(len(values), dtype=np.int32)
+    return rank
+
+
+class PlayerIndex:
+    """
+    Nombre normalizado (sin acentos / mayúsculas) -> posiciones de fila del dataset,
+    en formato CSR: las filas de cada jugador quedan contiguas en `order`. Con
+    Temporada, además elige la fila de una temporada dada o la más reciente.
+    """
+
+    def __init__(self, names: pd.Series, seasons: pd.Series | None = None):
+        self.n_rows = len(names)
+        # normalización sobre valores únicos; las filas sólo guardan código
+        raw, uniques = pd.factorize(names)
+        norm, self.names = pd.factorize(pd.Index([normalize_text(v) for v in uniques]))
+        codes = np.full(len(raw), -1, dtype=np.int64)
+        codes[raw >= 0] = norm[raw[raw >= 0]]
+        self.lookup = {n: k for k, n in enumerate(self.names)}
+
+        valid = np.flatnonzero(codes >= 0)
+        self.order = valid[np.argsort(codes[valid], kind="stable")]
+        self.offsets = np.searchsorted(codes[self.order], np.arange(len(self.names) + 1))
+
+        self.season_codes = None
+        self.season_rank = None
+        if seasons is not None:
+            s_codes, s_uniques = pd.factorize(seasons)
+            self.season_values = np.asarray(s_uniques, dtype=object)
+            self.season_lookup = {str(v).strip(): k for k, v in enumerate(self.season_values)}
+            rank = season_rank(self.season_values)
+            self.season_codes = s_codes
+            self.season_rank = np.where(s_codes >= 0, rank[np.maximum(s_codes, 0)], -1)
+
+    def rows(self, player, season=None) -> np.ndarray:
+        """Todas las filas del jugador (opcionalmente de una temporada)."""
+        k = self.lookup.get(normalize_text(player))
+        if k is None:
+            return np.empty(0, dtype=np.int64)
+        rows = self.order[self.offsets[k]:self.offsets[k + 1]]
+        if season is not None and self.season_codes is not None:
+            code = self.season_lookup.get(str(season).strip(), -2)
+            rows = rows[self.season_codes[rows] == code]
+        return rows
+
+    def seasons_of(self, player) -> list:
+        """Temporadas del jugador, la más reciente primero."""
+        if self.season_codes is None:
+            return []
+        rows = self.rows(player)
+        codes = np.unique(self.season_codes[rows])
+        codes = codes[codes >= 0]
+        rank = season_rank(self.season_values)
+        return [self.season_values[c] for c in codes[np.argsort(-rank[codes], kind="stable")]]
+
+    def pick(self, players: Sequence, season=None, within: np.ndarray | None = None) -> np.ndarray:
+        """
+        Una fila por jugador (-1 si no está): la de `season` si se pide, si no la
+        temporada más reciente (a igual temporada, la primera fila).
+        within: máscara booleana sobre filas del dataset (selección activa).
+        """
+        out = np.full(len(players), -1, dtype=np.int64)
+        for i, p in enumerate(players):
+            rows = self.rows(p, season)
+            if within is not None:
+                rows = rows[within[rows]]
+            if len(rows) == 0:
+                continue
+            if self.season_rank is not None and season is None:
+                r = self.season_rank[rows]
+                rows = rows[r == r.max()]
+            out[i] = rows[0]
+        return out
+
+    def season_of(self, rows: np.ndarray) -> list:
+        """Temporada de cada fila elegida (None si no hay fila o columna)."""
+        if self.season_codes is None:
+            return [None] * len(rows)
+        return [
+            self.season_values[self.season_codes[r]] if r >= 0 and self.season_codes[r] >= 0 else None
+            for r in rows
+        ]
+
+
+def player_index(ds: LazyDataset, player_col: str = "Jugador") -> PlayerIndex:
+    def build():
+        seasons = ds.select([SEASON_COL])[SEASON_COL] if SEASON_COL in ds.columns else None
+        return PlayerIndex(ds.select([player_col])[player_col], seasons)
+
+    return ds.derived(("player_index", player_col), build)
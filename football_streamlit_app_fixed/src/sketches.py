@@ -0,0 +1,208 @@
+import threading
+from typing import Sequence
+
+import numpy as np
+import pandas as pd
+
+from src.dataset import LazyDataset
+
+SKETCH_PARTITION_COLS = ["Temporada", "Liga"]
+SKETCH_SIZE = 256          # centroides (máximo) por partición y columna
+EXACT_MAX_ROWS = 20_000    # selecciones chicas: quantiles exactos
+MINUTES_COL = "minutos_jugados"
+MINUTES_STEP = 50          # paso del slider de minutos mínimos (filters.global_filters_ui)
+
+
+def partition_codes(df: pd.DataFrame, cols: Sequence[str]) -> np.ndarray:
+    """Código de partición por fila (combinación de cols; los nulos forman su propio grupo)."""
+    codes = np.zeros(len(df), dtype=np.int64)
+    for c in cols:
+        if c not in df.columns:
+            continue
+        k, uniques = pd.factorize(df[c], use_na_sentinel=False)
+        codes = codes * (len(uniques) + 1) + k
+    return pd.factorize(codes)[0].astype(np.int32)
+
+
+def minutes_base(minutes: pd.Series) -> int:
+    """Mínimo del slider de minutos (entero, como lo muestra filters)."""
+    return int(minutes.min()) if minutes.notna().any() else 0
+
+
+def minutes_bucket(minutes: pd.Series) -> pd.Series:
+    """
+    Tramo del slider por fila: minutos >= base + k * MINUTES_STEP <=> tramo >= k.
+    Cualquier valor del slider corta entre tramos; los nulos quedan en su propio grupo.
+    """
+    return (minutes - minutes_base(minutes)) // MINUTES_STEP
+
+
+class PartitionedIndex:
+    """
+    Partición fija de las filas de un dataset y chequeo de 'selección = unión de particiones'.
+    Si df trae minutos_jugados, el tramo de minutos entra en la clave: el filtro de
+    minutos mínimos (siempre activo) también selecciona particiones completas.
+    """
+
+    def __init__(self, df: pd.DataFrame, cols: Sequence[str]):
+        if MINUTES_COL in df.columns:
+            df = df.assign(_tramo_minutos=minutes_bucket(df[MINUTES_COL]))
+            cols = list(cols) + ["_tramo_minutos"]
+        self.codes = partition_codes(df, cols)
+        self.n_parts = int(self.codes.max()) + 1 if len(self.codes) else 0
+        self.sizes = np.bincount(self.codes, minlength=self.n_parts)
+
+    def covering_partitions(self, rows: np.ndarray | None) -> np.ndarray | None:
+        """Particiones de la selección si está formada por particiones completas; si no, None."""
+        if rows is None:
+            return np.arange(self.n_parts)
+        counts = np.bincount(self.codes[rows], minlength=self.n_parts)
+        touched = np.flatnonzero(counts)
+        if not np.array_equal(counts[touched], self.sizes[touched]):
+            return None
+        return touched
+
+
+class QuantileSketch:
+    """
+    Resumen de quantiles mergeable: centroides (media, peso) ordenados, estilo
+    t-digest con escala uniforme. Error de rango ~ 1 / SKETCH_SIZE.
+    """
+
+    def __init__(self, means: np.ndarray, weights: np.ndarray, vmin: float, vmax: float):
+        keep = weights > 0
+        order = np.argsort(means[keep], kind="stable")
+        self.means = means[keep][order]
+        self.weights = weights[keep][order]
+        self.min = vmin
+        self.max = vmax
+
+    @property
+    def count(self) -> float:
+        return float(self.weights.sum())
+
+    @classmethod
+    def merge(cls, sketches: Sequence["QuantileSketch"]) -> "QuantileSketch":
+        sketches = [s for s in sketches if s.count > 0]
+        if not sketches:
+            return cls(np.empty(0), np.empty(0), np.nan, np.nan)
+        return cls(
+            np.concatenate([s.means for s in sketches]),
+            np.concatenate([s.weights for s in sketches]),
+            min(s.min for s in sketches),
+            max(s.max for s in sketches),
+        )
+
+    def quantile(self, qs: Sequence[float]) -> np.ndarray:
+        qs = np.asarray(qs, dtype=float)
+        total = self.count
+        if total == 0:
+            return np.full(qs.shape, np.nan)
+        # cada centroide representa el rango centrado en su peso acumulado
+        centers = np.cumsum(self.weights) - self.weights / 2
+        xp = np.concatenate([[0.0], centers, [total]])
+        fp = np.concatenate([[self.min], self.means, [self.max]])
+        return np.interp(qs * total, xp, fp)
+
+
+class PartitionSketches:
+    """
+    Sketches por partición (Temporada x Liga x tramo de minutos), construidos por
+    columna bajo demanda. Cada partición guarda min(size, filas) centroides, todos
+    en un arreglo plano (offsets por partición): los tramos chicos no reservan size.
+    """
+
+    def __init__(self, ds: LazyDataset, cols: Sequence[str] = SKETCH_PARTITION_COLS, size: int = SKETCH_SIZE):
+        self._ds = ds
+        self.size = size
+        keys = [c for c in list(cols) + [MINUTES_COL] if c in ds.columns]
+        self.partitions = PartitionedIndex(ds.select(keys), cols)
+        self._columns: dict[str, tuple] = {}
+        self._lock = threading.Lock()
+
+    def _build(self, col: str) -> tuple:
+        vals = self._ds.select([col])[col].to_numpy(dtype="float64", na_value=np.nan)
+        parts = self.partitions.codes
+        ok = ~np.isnan(vals)
+        vals, parts = vals[ok], parts[ok]
+        n_parts, size = self.partitions.n_parts, self.size
+
+        # orden por (partición, valor): cada partición queda contigua y ordenada
+        order = np.lexsort((vals, parts))
+        vals, parts = vals[order], parts[order]
+        counts = np.bincount(parts, minlength=n_parts)
+        starts = np.concatenate([[0], np.cumsum(counts)[:-1]])
+        rank = np.arange(len(vals)) - starts[parts]
+        k = np.minimum(counts, size)
+        offsets = np.concatenate([[0], np.cumsum(k)])
+        bucket = rank * k[parts] // np.maximum(counts[parts], 1)
+        key = offsets[parts] + bucket
+
+        weights = np.bincount(key, minlength=offsets[-1]).astype(float)
+        sums = np.bincount(key, weights=vals, minlength=offsets[-1])
+        means = sums / np.maximum(weights, 1)
+        owner = np.repeat(np.arange(n_parts), k)    # partición de cada centroide
+        mins = np.full(n_parts, np.nan)
+        maxs = np.full(n_parts, np.nan)
+        has = counts > 0
+        mins[has] = vals[starts[has]]
+        maxs[has] = vals[starts[has] + counts[has] - 1]
+        return means, weights, owner, mins, maxs
+
+    def sketch(self, col: str, parts: np.ndarray) -> QuantileSketch:
+        with self._lock:
+            if col not in self._columns:
+                self._columns[col] = self._build(col)
+            means, weights, owner, mins, maxs = self._columns[col]
+        selected = np.zeros(self.partitions.n_parts, dtype=bool)
+        selected[parts] = True
+        take = selected[owner]
+        if not take.any():
+            return QuantileSketch(np.empty(0), np.empty(0), np.nan, np.nan)
+        return QuantileSketch(means[take], weights[take], np.nanmin(mins[parts]), np.nanmax(maxs[parts]))
+
+
+def sketch_index(ds: LazyDataset) -> PartitionSketches:
+    return ds.derived("quantile_sketches", lambda: PartitionSketches(ds))
+
+
+def sketch_quantiles(
+    ds: LazyDataset,
+    rows: np.ndarray | None,
+    columns: Sequence[str],
+    qs: Sequence[float],
+) -> pd.DataFrame | None:
+    """
+    Quantiles aproximados (index=qs, columns=columns) combinando los sketches de
+    las particiones seleccionadas. None si la selección es chica (conviene exacto),
+    no es unión de particiones completas o sus particiones son tan chicas que los
+    sketches guardan casi todos los valores (ordenarlos cuesta lo mismo que exacto).
+    """
+    n = ds.n_rows if rows is None else len(rows)
+    if n <= EXACT_MAX_ROWS or not any(c in ds.columns for c in SKETCH_PARTITION_COLS):
+        return None
+    idx = sketch_index(ds)
+    parts = idx.partitions.covering_partitions(rows)
+    if parts is None or n < 2 * idx.size * len(parts):
+        return None
+    return pd.DataFrame(
+        {c: idx.sketch(c, parts).quantile(qs) for c in columns if c in ds.columns},
+        index=pd.Index(list(qs)),
+    )
+
+
+def dataset_quantiles(
+    ds: LazyDataset,
+    rows: np.ndarray | None,
+    columns: Sequence[str],
+    qs: Sequence[float],
+) -> pd.DataFrame:
+    """Quantiles de ds filtrado por rows: sketches si se puede, si no exacto sobre las filas."""
+    columns = [c for c in columns if c in ds.columns]
+    out = sketch_quantiles(ds, rows, columns, qs)
+    if out is not None:
+        return out
+    df = ds.select(columns)
+    if rows is not None:
+        df = df.iloc[rows]
+    return df.quantile(list(qs))
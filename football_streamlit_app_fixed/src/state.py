@@ -1,14 +1,36 @@
+import hashlib
+
+import numpy as np
+import pandas as pd
 import streamlit as st
 
 def init_state():
+    # El dataset es una referencia al registro compartido; los subconjuntos
+    # derivados se guardan como posiciones de fila, no como copias del df.
     defaults = {
-        "df_raw": None,
-        "df_global": None,   # df tras filtros globales (exploratorio)
-        "df_pos": None,      # df tras filtro de posición/minutos (PCA)
-        "df_modelado": None, # df con PCA1/PCA2/distancia
-        "similares": None,
+        "dataset": None,         # LazyDataset compartido (columnas bajo demanda)
+        "global_rows": None,     # filas tras filtros globales (exploratorio)
+        "pos_rows": None,        # filas tras filtro de posición/minutos (PCA)
+        "modelado_rows": None,   # filas usadas en el PCA
+        "pca_coords": None,      # PCA1/PCA2 alineados con modelado_rows
+        "similares_rows": None,  # filas similares, ordenadas por distancia
+        "similares_dist": None,  # distancia alineada con similares_rows
+        "similares_ref": None,   # (jugador, temporada) de la última consulta
         "global_filters": {},
     }
     for k, v in defaults.items():
         if k not in st.session_state:
             st.session_state[k] = v
+
+def row_positions(df: pd.DataFrame) -> np.ndarray:
+    """Posiciones de fila en el dataset compartido (su index es un RangeIndex)."""
+    return df.index.to_numpy(dtype=np.int64)
+
+def take_rows(df: pd.DataFrame, rows: np.ndarray | None) -> pd.DataFrame:
+    return df if rows is None else df.iloc[rows]
+
+def selection_key(rows: np.ndarray | None) -> str:
+    """Clave estable para una selección de filas (para caches por dataset + filtros)."""
+    if rows is None:
+        return "all"
+    return hashlib.blake2b(np.ascontiguousarray(rows, dtype=np.int64).tobytes(), digest_size=16).hexdigest()
@@ -0,0 +1,152 @@
+import hashlib
+import json
+import os
+import threading
+from pathlib import Path
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+# Cache local de datasets ya convertidos a Parquet, indexado por hash del contenido.
+# Se puede mover / limitar con variables de entorno.
+CACHE_DIR = Path(os.environ.get(
+    "FOOTBALL_CACHE_DIR",
+    Path(__file__).resolve().parents[1] / ".cache" / "datasets",
+))
+CACHE_MAX_BYTES = int(os.environ.get("FOOTBALL_CACHE_MAX_BYTES", 2 * 1024 ** 3))
+META_KEY = b"football_explorer"
+
+_lock = threading.Lock()
+_pins: dict[Path, int] = {}     # artefactos en uso por LazyDataset vivos (no se desalojan)
+
+
+def content_hash(data: bytes) -> str:
+    """Hash estable del archivo subido (no depende del nombre)."""
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+def artifact_path(digest: str) -> Path:
+    return CACHE_DIR / f"{digest}.parquet"
+
+
+def open_artifact(digest: str, pin: bool = False) -> Path | None:
+    """
+    Path del Parquet cacheado (y lo marca como usado) o None si no existe / está corrupto.
+    pin: lo fija (ver pin) en el mismo paso en que se comprueba que existe, así un
+    evict concurrente no lo puede borrar entre medio.
+    """
+    path = artifact_path(digest)
+    with _lock:
+        if not path.exists():
+            return None
+        if pin:
+            _pins[path] = _pins.get(path, 0) + 1
+    try:
+        pq.read_schema(path)
+    except (OSError, pa.ArrowException):
+        if pin:
+            unpin(path)
+        path.unlink(missing_ok=True)
+        return None
+    _touch(path)
+    return path
+
+
+def column_names(path: Path) -> list[str]:
+    return list(pq.read_schema(path).names)
+
+
+def num_rows(path: Path) -> int:
+    return pq.ParquetFile(path).metadata.num_rows
+
+
+def read_metadata(path: Path) -> dict:
+    meta = (pq.read_schema(path).metadata or {}).get(META_KEY)
+    return json.loads(meta) if meta else {}
+
+
+def read_columns(path: Path, columns: list[str] | None = None) -> pd.DataFrame:
+    """Lee sólo las columnas pedidas (column pruning de pyarrow), memory-mapped."""
+    df = pq.read_table(path, columns=columns, memory_map=True).to_pandas()
+    _touch(path)   # las lecturas lazy también cuentan como uso para el LRU
+    return df
+
+
+def pin(path: Path):
+    """Marca el artefacto como en uso: evict no lo borra hasta el unpin correspondiente."""
+    with _lock:
+        _pins[path] = _pins.get(path, 0) + 1
+
+
+def unpin(path: Path):
+    with _lock:
+        n = _pins.pop(path, 0) - 1
+        if n > 0:
+            _pins[path] = n
+
+
+def load_artifact(digest: str) -> pd.DataFrame | None:
+    """Lee el Parquet cacheado completo o None si no existe / está corrupto."""
+    path = open_artifact(digest)
+    if path is None:
+        return None
+    df = read_columns(path)
+    df.attrs.update(read_metadata(path))
+    return df
+
+
+def save_artifact(digest: str, df: pd.DataFrame, metadata: dict | None = None, pin: bool = False) -> Path:
+    """Escribe el df como Parquet (atómico) y aplica la política LRU.
+
+    metadata se guarda en el schema y vuelve en df.attrs al leer.
+    pin: lo deja fijado antes de que sea visible para un evict concurrente.
+    """
+    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    path = artifact_path(digest)
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        if metadata:
+            table = table.replace_schema_metadata({**(table.schema.metadata or {}), META_KEY: json.dumps(metadata)})
+        pq.write_table(table, tmp)
+        with _lock:
+            os.replace(tmp, path)
+            if pin:
+                _pins[path] = _pins.get(path, 0) + 1
+    finally:
+        tmp.unlink(missing_ok=True)
+    evict(keep=path)
+    return path
+
+
+def evict(max_bytes: int | None = None, keep: Path | None = None) -> list[Path]:
+    """Borra los artefactos menos usados hasta quedar bajo max_bytes (salvo los que están en uso)."""
+    max_bytes = CACHE_MAX_BYTES if max_bytes is None else max_bytes
+    removed = []
+    with _lock:
+        entries = []
+        for p in CACHE_DIR.glob("*.parquet"):
+            try:
+                stat = p.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, p))
+        total = sum(size for _, size, _ in entries)
+        # mtime = último acceso (ver _touch), el más viejo sale primero
+        for _, size, p in sorted(entries, key=lambda e: e[0]):
+            if total <= max_bytes:
+                break
+            if (keep is not None and p == keep) or p in _pins:
+                continue
+            p.unlink(missing_ok=True)
+            total -= size
+            removed.append(p)
+    return removed
+
+
+def _touch(path: Path):
+    try:
+        os.utime(path, None)
+    except OSError:
+        pass
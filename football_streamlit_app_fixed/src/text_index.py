@@ -0,0 +1,69 @@
+import re
+import unicodedata
+from typing import Sequence
+
+import numpy as np
+import pandas as pd
+
+from src.dataset import LazyDataset
+
+_QUERY_SPLIT = re.compile(r"[|,;]")          # "CB|LCB, RCB" -> varias alternativas
+_TOKEN_SPLIT = re.compile(r"[\s,;/|()\-]+")  # "LCB, CB" -> lcb, cb
+
+
+def normalize_text(s) -> str:
+    """Minúsculas, sin acentos y sin espacios extremos."""
+    if not isinstance(s, str):
+        s = str(s)
+    return unicodedata.normalize("NFKD", s).encode("ascii", "ignore").decode("utf-8").lower().strip()
+
+
+def split_terms(query) -> list[str]:
+    """Texto del usuario (o lista de valores) -> términos normalizados (OR entre ellos)."""
+    if query is None:
+        return []
+    parts = _QUERY_SPLIT.split(query) if isinstance(query, str) else query
+    return [t for t in (normalize_text(p) for p in parts) if t]
+
+
+class TextColumnIndex:
+    """
+    Índice de texto normalizado para una columna. La normalización y el split
+    en tokens se hacen sobre los valores únicos; las filas sólo guardan un código.
+    """
+
+    def __init__(self, s: pd.Series):
+        codes, uniques = pd.factorize(s)
+        self.codes = codes.astype(np.int32)
+        self.values = np.array([normalize_text(v) for v in uniques], dtype=str)
+        tokens: dict[str, list[int]] = {}
+        for k, v in enumerate(self.values):
+            for tok in set(_TOKEN_SPLIT.split(v)):
+                if tok:
+                    tokens.setdefault(tok, []).append(k)
+        self.tokens = {t: np.array(ks, dtype=np.int32) for t, ks in tokens.items()}
+
+    def match_codes(self, terms: Sequence[str], mode: str = "contains") -> np.ndarray:
+        """Códigos de valores que matchean algún término ('contains' = substring, 'token' = token exacto)."""
+        if mode == "token":
+            hits = [self.tokens[t] for t in terms if t in self.tokens]
+            return np.unique(np.concatenate(hits)) if hits else np.empty(0, dtype=np.int32)
+        if len(self.values) == 0 or not terms:
+            return np.empty(0, dtype=np.int32)
+        hit = np.zeros(len(self.values), dtype=bool)
+        for t in terms:
+            hit |= np.char.find(self.values, t) >= 0
+        return np.flatnonzero(hit)
+
+    def mask(self, terms: Sequence[str], mode: str = "contains") -> np.ndarray:
+        # lookup table por código; el último lugar (código -1 = nulo) queda en False
+        lut = np.zeros(len(self.values) + 1, dtype=bool)
+        lut[self.match_codes(terms, mode)] = True
+        return lut[self.codes]
+
+    def rows(self, terms: Sequence[str], mode: str = "contains") -> np.ndarray:
+        return np.flatnonzero(self.mask(terms, mode))
+
+
+def text_index(ds: LazyDataset, col: str) -> TextColumnIndex:
+    return ds.derived(("text_index", col), lambda: TextColumnIndex(ds.select([col])[col]))
@@ -0,0 +1,58 @@
+import numpy as np
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+from src.charts.bees import DEFAULT_PALETTE, MetricBees, plot_bees, swarm_layout
+
+
+def _min_distance(x: np.ndarray, y: np.ndarray) -> float:
+    d = np.hypot(x[:, None] - x[None, :], y[:, None] - y[None, :])
+    np.fill_diagonal(d, np.inf)
+    return float(d.min())
+
+
+def test_swarm_sin_solapes():
+    rng = np.random.default_rng(0)
+    # valores agrupados (empates) y dispersos
+    for x in (np.round(rng.gamma(2, 2, 600), 1), rng.uniform(0, 200, 600)):
+        y = swarm_layout(x, 1.0)
+        assert _min_distance(x, y) >= 1.0 - 1e-9
+
+
+def test_swarm_limite_y_borde():
+    rng = np.random.default_rng(1)
+    x = rng.normal(0, 1, 800)
+    limit = 3.0
+    y = swarm_layout(x, 0.5, limit=limit)
+    assert np.all(np.abs(y) <= limit)
+    # los que no entran quedan en el borde; los de adentro no se pisan
+    dentro = np.abs(y) < limit
+    assert (~dentro).any()
+    assert _min_distance(x[dentro], y[dentro]) >= 0.5 - 1e-9
+
+
+def test_swarm_orden_y_vacio():
+    x = np.array([3.0, 1.0, 2.0, 1.4, 1.7])
+    y = swarm_layout(x, 1.0)
+    # sin empates la salida no depende del orden de entrada
+    perm = np.array([2, 0, 4, 3, 1])
+    np.testing.assert_allclose(swarm_layout(x[perm], 1.0), y[perm])
+    assert len(swarm_layout(np.empty(0), 1.0)) == 0
+
+
+def test_plot_bees_sin_solapes_en_pixeles():
+    rng = np.random.default_rng(2)
+    values = rng.gamma(2, 2, 400)
+    bees = MetricBees("m", values, np.zeros(len(values), dtype=np.uint8), np.empty(0, dtype=object), np.nan, np.nan, False)
+    fig = Figure(figsize=(8, 3), dpi=100)
+    canvas = FigureCanvasAgg(fig)
+    ax = fig.add_subplot(111)
+    size = 6
+    swarm = plot_bees(ax, bees, palette=DEFAULT_PALETTE, size=size)
+    ax.set_ylim(-0.5, 0.8)
+    canvas.draw()
+    px = ax.transData.transform(swarm.get_offsets())
+    half = abs(ax.transData.transform([[0, 0.4]])[0, 1] - ax.transData.transform([[0, 0]])[0, 1])
+    dentro = np.abs(px[:, 1] - ax.transData.transform([[0, 0]])[0, 1]) < half - 1e-6
+    diameter = size * fig.dpi / 72
+    assert _min_distance(px[dentro, 0], px[dentro, 1]) >= diameter - 1e-6
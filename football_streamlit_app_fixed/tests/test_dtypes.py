@@ -0,0 +1,44 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.dtypes import STRING_DTYPE, coerce_numeric_text, compact_dtypes
+
+
+@pytest.mark.parametrize("values, expected", [
+    (["45,3%", "12%", None], [45.3, 12.0, np.nan]),
+    (["1.234,5", "2,0"], [1234.5, 2.0]),
+    (["12.5", "-3", "+0.25"], [12.5, -3.0, 0.25]),
+    (["0,5", "10"], [0.5, 10.0]),
+])
+def test_texto_numerico(values, expected):
+    out = coerce_numeric_text(pd.Series(values, dtype=object))
+    np.testing.assert_allclose(out.to_numpy(), expected)
+
+
+@pytest.mark.parametrize("values", [
+    ["2024", "2023"],                # temporadas: sólo dígitos
+    ["12345", "67890"],              # IDs
+    ["007", "1.5"],                  # cero a la izquierda
+    ["abc", "1,5"],                  # texto
+    [None, None],                    # sin valores
+    ["1.2.3", "4,5"],                # no parsea
+])
+def test_queda_como_texto(values):
+    assert coerce_numeric_text(pd.Series(values, dtype=object)) is None
+
+
+def test_compact_dtypes():
+    df = pd.DataFrame({
+        "Temporada": ["2024", "2023"] * 50,
+        "Jugador": [f"J{i}" for i in range(100)],
+        "Precisión pases, %": ["45,3%", "50%"] * 50,
+        "xG/90": np.linspace(0, 1, 100),
+    })
+    df, report = compact_dtypes(df)
+    assert df["Temporada"].dtype == "category"
+    assert df["Jugador"].dtype == STRING_DTYPE
+    assert df["Precisión pases, %"].dtype == np.float32
+    assert df["xG/90"].dtype == np.float32
+    assert report["bytes_saved"] == report["bytes_before"] - report["bytes_after"]
+    assert set(report["columns"]) == {"Temporada", "Jugador", "Precisión pases, %", "xG/90"}
@@ -0,0 +1,73 @@
+import numpy as np
+import pandas as pd
+
+from src.filters import FILTER_COLS, FilterIndex, canonical_filters
+
+
+def _df(n=3_000, seed=2):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        "Temporada": rng.choice(["2022/2023", "2023/2024", "2024"], n),
+        "País": rng.choice(["Argentina", "España", "Brasil"], n),
+        "Liga": rng.choice(["Primera", "Segunda", "Serie A"], n),
+        "Equipo": rng.choice([f"Equipo {i}" for i in range(12)], n),
+        "Pie": rng.choice(["derecho", "izquierdo", None], n),
+    })
+    df["Liga"] = df["Liga"].astype("category")
+    return df
+
+
+FILTROS = [
+    {},
+    {"Liga": ["Primera"]},
+    {"Temporada": ["2024", "2023/2024"], "Pie": ["izquierdo"]},
+    {"País": ["España"], "Equipo": ["Equipo 3", "Equipo 7"], "Liga": ["Serie A", "Primera"]},
+    {"Equipo": ["no existe"]},
+]
+
+
+def _pandas_mask(df: pd.DataFrame, filters: dict) -> np.ndarray:
+    mask = np.ones(len(df), dtype=bool)
+    for c in FILTER_COLS:
+        if filters.get(c):
+            mask &= df[c].isin(filters[c]).to_numpy()
+    return mask
+
+
+def test_mask_igual_a_pandas():
+    df = _df()
+    idx = FilterIndex(df)
+    for f in FILTROS:
+        got = idx.mask(f)
+        if not f:
+            assert got is None
+            continue
+        np.testing.assert_array_equal(got, _pandas_mask(df, f))
+
+
+def test_facet_counts_igual_a_pandas():
+    df = _df()
+    idx = FilterIndex(df)
+    for f in FILTROS:
+        counts = idx.facet_counts(f)
+        for c in FILTER_COLS:
+            # conteo de cada valor con los filtros de las otras columnas
+            otros = {k: v for k, v in f.items() if k != c}
+            esperado = df.loc[_pandas_mask(df, otros), c].value_counts()
+            got = dict(zip(idx.options[c], counts[c]))
+            assert got == {v: int(esperado.get(v, 0)) for v in idx.options[c]}
+
+
+def test_facet_counts_con_mascara_extra():
+    df = _df()
+    idx = FilterIndex(df)
+    extra = np.arange(len(df)) % 3 == 0
+    counts = idx.facet_counts({"Liga": ["Segunda"]}, extra_mask=extra)
+    esperado = df.loc[extra & _pandas_mask(df, {"Liga": ["Segunda"]}), "Equipo"].value_counts()
+    assert dict(zip(idx.options["Equipo"], counts["Equipo"])) == {v: int(esperado.get(v, 0)) for v in idx.options["Equipo"]}
+
+
+def test_canonical_filters_ignora_orden_y_vacios():
+    a = canonical_filters({"Liga": ["B", "A"], "Pie": [], "posicion_contains": "", "min_minutos": 300})
+    b = canonical_filters({"min_minutos": 300, "Liga": ["A", "B"]})
+    assert a == b
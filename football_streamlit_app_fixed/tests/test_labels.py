@@ -0,0 +1,60 @@
+import numpy as np
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+from src.charts.labels import BoxGrid, place_labels
+
+
+def _figura(points: np.ndarray, names: list[str]):
+    fig = Figure(figsize=(8, 6), dpi=100)
+    canvas = FigureCanvasAgg(fig)
+    ax = fig.add_subplot(111)
+    ax.scatter(points[:, 0], points[:, 1], s=30)
+    labels = [
+        ax.annotate(n, tuple(p), textcoords="offset points", xytext=(14, 10), fontsize=9, ha="left", va="bottom",
+                    bbox=dict(boxstyle="round,pad=0.3", fc="gray", ec="gray"))
+        for n, p in zip(names, points)
+    ]
+    fig.tight_layout()
+    return fig, canvas, ax, labels
+
+
+def _cajas(canvas, labels) -> list:
+    canvas.draw()
+    renderer = canvas.get_renderer()
+    return [a.get_bbox_patch().get_window_extent(renderer).extents for a in labels]
+
+
+def test_etiquetas_no_se_pisan():
+    rng = np.random.default_rng(3)
+    # cúmulo de puntos: con el offset fijo casi todas las etiquetas se pisan
+    points = rng.normal(0, 1, (15, 2))
+    names = [f"Jugador {i} Núñez" for i in range(len(points))]
+    fig, canvas, ax, labels = _figura(np.vstack([points, [[-6, -6], [6, 6]]]), names + ["", ""])
+    labels = labels[:len(names)]
+    place_labels(ax, labels, points)
+    cajas = _cajas(canvas, labels)
+    frame = ax.get_window_extent(canvas.get_renderer()).extents
+    tol = 1.0   # píxeles: el ancho se estima por glifos, no con el layout completo
+    for i, a in enumerate(cajas):
+        assert a[0] >= frame[0] - tol and a[2] <= frame[2] + tol
+        for b in cajas[i + 1:]:
+            inter_x = min(a[2], b[2]) - max(a[0], b[0])
+            inter_y = min(a[3], b[3]) - max(a[1], b[1])
+            assert inter_x <= tol or inter_y <= tol
+
+
+def test_etiqueta_sin_coordenadas_se_ignora():
+    points = np.array([[0.0, 0.0], [np.nan, 1.0], [1.0, 1.0]])
+    fig, canvas, ax, labels = _figura(points, ["a", "b", "c"])
+    before = labels[1].xyann
+    place_labels(ax, labels, points)
+    assert labels[1].xyann == before
+
+
+def test_box_grid():
+    grid = BoxGrid(10.0)
+    grid.insert((0, 0, 15, 5))
+    assert grid.overlaps((14, 4, 30, 20))
+    assert not grid.overlaps((15, 0, 30, 5))     # borde compartido no es choque
+    assert not grid.overlaps((100, 100, 110, 110))
@@ -0,0 +1,64 @@
+import numpy as np
+import pandas as pd
+
+from src.partition_stats import PartitionStats
+
+
+def _df(n=5_000, seed=1):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        "Temporada": rng.choice(["2023", "2024"], n),
+        "Liga": rng.choice(["L1", "L2"], n),
+        "Equipo": rng.choice(["A", "B", "C"], n),
+        "minutos_jugados": rng.integers(0, 1500, n).astype(float),
+        # magnitud grande + varianza chica: sum / sum² cancelaría acá
+        "valor": 1e9 + rng.normal(0, 1, n),
+        "pct": rng.uniform(0, 100, n),
+    })
+    df.loc[rng.random(n) < 0.05, "pct"] = np.nan
+    return pd.concat([df, df.iloc[:40]], ignore_index=True)   # duplicados
+
+
+def _check(stats: PartitionStats, sub: pd.DataFrame, parts: np.ndarray):
+    agg = stats.combine(parts)
+    num = sub[stats.numeric_columns]
+    assert agg["n_rows"] == len(sub)
+    assert agg["duplicates"] == int(sub.duplicated().sum())
+    pd.testing.assert_series_equal(agg["nulls"], sub.isna().sum(), check_names=False, check_dtype=False)
+    desc = agg["numeric"]
+    np.testing.assert_allclose(desc["count"], num.count())
+    np.testing.assert_allclose(desc["mean"], num.mean(), rtol=1e-12)
+    # valor ~1e9 con desvío 1: con sum / sum² el error sería de órdenes de magnitud
+    np.testing.assert_allclose(desc["std"], num.std(), rtol=1e-6)
+    np.testing.assert_allclose(desc["min"], num.min())
+    np.testing.assert_allclose(desc["max"], num.max())
+
+
+def test_combine_igual_a_pandas():
+    df = _df()
+    stats = PartitionStats(df)
+    base = int(df["minutos_jugados"].min())
+    for umbral, ligas in ((base, None), (base + 300, None), (base + 650, ["L2"])):
+        mask = df["minutos_jugados"] >= umbral
+        if ligas:
+            mask &= df["Liga"].isin(ligas)
+        rows = np.flatnonzero(mask.to_numpy())
+        parts = stats.partitions.covering_partitions(rows)
+        assert parts is not None
+        _check(stats, df.iloc[rows], parts)
+
+
+def test_filtro_parcial_no_cubre():
+    df = _df()
+    stats = PartitionStats(df)
+    # Equipo no es parte de la clave: filtrar por equipo va por filas
+    rows = np.flatnonzero((df["Equipo"] == "A").to_numpy())
+    assert stats.partitions.covering_partitions(rows) is None
+
+
+def test_std_con_una_fila():
+    df = pd.DataFrame({"Temporada": ["2024", "2023"], "Liga": ["L1", "L1"], "valor": [1.0, 2.0]})
+    stats = PartitionStats(df)
+    agg = stats.combine(np.array([0]))
+    assert agg["numeric"].loc["valor", "count"] == 1 and np.isnan(agg["numeric"].loc["valor", "std"])
+    _check(stats, df, np.arange(stats.partitions.n_parts))
@@ -0,0 +1,40 @@
+import numpy as np
+import pandas as pd
+
+from src.charts.radar import prepare_radar_values, radar_values
+from src.percentiles import PercentileCube
+
+
+def _df():
+    return pd.DataFrame({
+        "Jugador": ["A", "B", "C", "D", "A"],
+        "Temporada": ["2023", "2023", "2023", "2023", "2024"],
+        "Liga": ["L1"] * 5,
+        "posicion": ["CB", "LCB", "RCB", "CB", "CB"],
+        "Goles/90": [0.1, 0.2, 0.3, 0.4, 0.5],
+        "Pases/90": [30.0, 40.0, np.nan, 50.0, 60.0],
+    })
+
+
+def test_radar_values_sin_cubo():
+    df = _df()
+    rv = radar_values(df, ["Goles/90", "Pases/90"], ["A", "B"])
+    assert rv.params == ["Goles/90", "Pases/90"]
+    # A: temporada más reciente (2024)
+    np.testing.assert_allclose(rv.values, [[0.5, 60.0], [0.2, 40.0]])
+    np.testing.assert_allclose(rv.mean, [0.3, 45.0])
+    assert rv.seasons == ["2024", "2023"]
+
+    params, low, high, mean_vals, median_vals, values = prepare_radar_values(df, ["Goles/90"], players=["C"])
+    assert params == ["Goles/90"] and values == {"C": [0.3]}
+
+
+def test_radar_values_con_cubo():
+    df = _df()
+    cube = PercentileCube(df)
+    rv = radar_values(df, ["Goles/90", "Pases/90"], ["A", "C"], season="2023", cube=cube)
+    np.testing.assert_allclose(rv.low, [0, 0])
+    np.testing.assert_allclose(rv.high, [100, 100])
+    # grupo 2023 x L1 x Central: A es el menor de 4 en goles y de 3 en pases; C no tiene pases
+    np.testing.assert_allclose(rv.values[0], [25.0, 33.0])
+    assert rv.values[1][0] == 75.0 and np.isnan(rv.values[1][1])
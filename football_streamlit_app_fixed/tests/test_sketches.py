@@ -0,0 +1,64 @@
+import numpy as np
+import pandas as pd
+
+from src.dataset import LazyDataset
+from src.sketches import MINUTES_STEP, PartitionSketches, QuantileSketch, minutes_bucket
+
+
+def _df(n=20_000, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        "Temporada": rng.choice(["2023", "2024"], n),
+        "Liga": rng.choice(["L1", "L2", "L3"], n),
+        "minutos_jugados": rng.integers(0, 3000, n).astype(float),
+        "xG/90": rng.gamma(2, 0.2, n),
+    })
+
+
+def _rank_error(values: np.ndarray, q: float, estimate: float) -> float:
+    # distancia de q al rango [P(X < est), P(X <= est)] de la estimación (con empates)
+    lo, hi = (values < estimate).mean(), (values <= estimate).mean()
+    return max(lo - q, q - hi, 0.0)
+
+
+def test_minutes_bucket_corta_en_el_paso_del_slider():
+    minutos = pd.Series([7.0, 56.0, 57.0, 106.9, np.nan])
+    # base = 7 (mínimo entero): 57 es el primer valor del tramo 1
+    np.testing.assert_array_equal(minutes_bucket(minutos).to_numpy()[:4], [0, 0, 1, 1])
+    assert np.isnan(minutes_bucket(minutos).iloc[4])
+
+
+def test_quantiles_dentro_del_error_de_rango():
+    df = _df()
+    size = 32
+    sk = PartitionSketches(LazyDataset("t", frame=df), size=size)
+    base = int(df["minutos_jugados"].min())
+    for umbral, ligas in ((base, None), (base + 6 * MINUTES_STEP, None), (base + 20 * MINUTES_STEP, ["L1", "L3"])):
+        mask = df["minutos_jugados"] >= umbral
+        if ligas:
+            mask &= df["Liga"].isin(ligas)
+        rows = np.flatnonzero(mask.to_numpy())
+        parts = sk.partitions.covering_partitions(rows)
+        assert parts is not None
+        qs = [0.05, 0.25, 0.5, 0.75, 0.95]
+        est = sk.sketch("xG/90", parts).quantile(qs)
+        values = df["xG/90"].to_numpy()[rows]
+        for q, e in zip(qs, est):
+            assert _rank_error(values, q, e) <= 1 / size
+
+
+def test_umbral_entre_tramos_no_cubre():
+    df = _df()
+    sk = PartitionSketches(LazyDataset("t", frame=df), size=32)
+    base = int(df["minutos_jugados"].min())
+    rows = np.flatnonzero((df["minutos_jugados"] >= base + MINUTES_STEP / 2).to_numpy())
+    assert sk.partitions.covering_partitions(rows) is None
+
+
+def test_merge_y_vacio():
+    a = QuantileSketch(np.array([1.0, 3.0]), np.array([1.0, 1.0]), 1.0, 3.0)
+    b = QuantileSketch(np.array([2.0]), np.array([1.0]), 2.0, 2.0)
+    m = QuantileSketch.merge([a, b])
+    assert m.count == 3 and (m.min, m.max) == (1.0, 3.0)
+    np.testing.assert_allclose(m.quantile([0.5]), [2.0])
+    assert np.isnan(QuantileSketch.merge([]).quantile([0.5])).all()
@@ -0,0 +1,73 @@
+import gc
+import os
+
+import pandas as pd
+import pytest
+
+from src import store
+from src.dataset import LazyDataset
+
+
+@pytest.fixture(autouse=True)
+def cache_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(store, "CACHE_DIR", tmp_path)
+    monkeypatch.setattr(store, "_pins", {})
+    return tmp_path
+
+
+def _save(digest: str, age: int, **kwargs):
+    path = store.save_artifact(digest, pd.DataFrame({"a": range(1000)}), **kwargs)
+    # mtime = último uso: más viejo cuanto mayor age
+    os.utime(path, (1_000_000 - age, 1_000_000 - age))
+    return path
+
+
+def test_evict_borra_los_menos_usados():
+    viejo, medio, nuevo = _save("viejo", 3), _save("medio", 2), _save("nuevo", 1)
+    size = viejo.stat().st_size
+    removed = store.evict(max_bytes=2 * size)
+    assert removed == [viejo]
+    assert medio.exists() and nuevo.exists()
+    assert store.evict(max_bytes=0, keep=nuevo) == [medio]
+    assert nuevo.exists()
+
+
+def test_evict_respeta_los_fijados():
+    viejo, nuevo = _save("viejo", 2, pin=True), _save("nuevo", 1)
+    assert store.evict(max_bytes=0) == [nuevo]
+    assert viejo.exists()
+    store.unpin(viejo)
+    assert store.evict(max_bytes=0) == [viejo]
+
+
+def test_pins_con_contador():
+    path = _save("a", 1)
+    store.pin(path)
+    store.pin(path)
+    store.unpin(path)
+    assert store.evict(max_bytes=0) == []
+    store.unpin(path)
+    assert store.evict(max_bytes=0) == [path]
+
+
+def test_open_artifact():
+    assert store.open_artifact("no-existe", pin=True) is None
+    path = _save("a", 1)
+    assert store.open_artifact("a", pin=True) == path
+    assert store.evict(max_bytes=0) == []
+    # corrupto: se borra y no queda fijado
+    store.unpin(path)
+    path.write_bytes(b"no es parquet")
+    assert store.open_artifact("a", pin=True) is None
+    assert not path.exists() and path not in store._pins
+
+
+def test_lazy_dataset_fija_mientras_vive():
+    path = _save("a", 1, metadata={"ingest": {"bytes_saved": 1}}, pin=True)
+    ds = LazyDataset("a", path=path, pinned=True)
+    assert store.evict(max_bytes=0) == []
+    assert ds.select(["a"])["a"].sum() == sum(range(1000))
+    assert store.load_artifact("a").attrs["ingest"] == {"bytes_saved": 1}
+    del ds
+    gc.collect()
+    assert store.evict(max_bytes=0) == [path]